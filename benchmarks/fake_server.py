@@ -0,0 +1,434 @@
+# Local stand-in for the SharePoint endpoints SharePlum calls
+# Serves a synthetic List and Document Library from memory so
+# benchmarks can run without a SharePoint server.
+#
+#   python benchmarks/fake_server.py --rows 100000 --width 20 --latency 0.05
+#
+# Implements lists.asmx (GetList, GetListItems, UpdateListItems,
+# GetListCollection, GetListItemChangesSinceToken), Views.asmx
+# (GetView, GetViewCollection), SiteData.asmx (GetListCollection),
+# /_api/contextinfo and the /_api/web/ folder, file and upload calls.
+# Python 3 only.
+
+import argparse
+import re
+import threading
+import time
+from datetime import datetime, timedelta
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from socketserver import ThreadingMixIn
+from urllib.parse import unquote
+from xml.sax.saxutils import escape, quoteattr
+
+from lxml import etree
+
+SOAP_NS = '{http://schemas.microsoft.com/sharepoint/soap/}'
+ENVELOPE = ('<?xml version="1.0" encoding="utf-8"?>'
+            '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+            '<{0}Response xmlns="http://schemas.microsoft.com/sharepoint/soap/"><{0}Result>%s'
+            '</{0}Result></{0}Response></soap:Body></soap:Envelope>')
+# SiteData.asmx puts its data next to the Result, not in it
+SITEDATA_ENVELOPE = ('<?xml version="1.0" encoding="utf-8"?>'
+                     '<soap:Envelope xmlns:soap="http://schemas.xmlsoap.org/soap/envelope/"><soap:Body>'
+                     '<{0}Response xmlns="http://schemas.microsoft.com/sharepoint/soap/">'
+                     '<{0}Result>0</{0}Result>%s</{0}Response></soap:Body></soap:Envelope>')
+ROWSET = '<listitems xmlns:rs="urn:schemas-microsoft-com:rowset" xmlns:z="#RowsetSchema">%s</listitems>'
+ATOM = ('xmlns="http://www.w3.org/2005/Atom" '
+        'xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices" '
+        'xmlns:m="http://schemas.microsoft.com/ado/2007/08/dataservices/metadata"')
+
+# Column types cycled through after ID and Title
+TYPES = ['Text', 'Number', 'DateTime', 'Choice', 'User', 'Boolean', 'Currency', 'Note']
+USERS = ['Ada Lovelace', 'Alan Turing', 'Grace Hopper', 'Edsger Dijkstra', 'Barbara Liskov']
+CHOICES = ['Not Started', 'In Progress', 'Completed', 'Deferred']
+EPOCH = datetime(2020, 1, 1)
+
+
+class FakeSharePoint(object):
+    """Synthetic content served by the fake server
+
+       rows: items in the List
+       width: columns in the List, ID and Title included
+       latency: seconds added to every response
+       files, file_size, folders: Document Library layout, files
+       are spread over folders nested one level under the root
+    """
+
+    def __init__(self, rows=10000, width=10, latency=0.0, files=20, file_size=1024 * 1024, folders=4,
+                 list_name='Bench'):
+        self.rows = rows
+        self.latency = latency
+        self.list_name = list_name
+        # Version of the List schema, GetList and GetListCollection report it
+        self.version = 1
+        self.fields = [('ID', 'ID', 'Counter'), ('Title', 'Title', 'Text')]
+        for index in range(max(width - 2, 0)):
+            field_type = TYPES[index % len(TYPES)]
+            self.fields.append(('Col%d_x0020_%s' % (index, field_type), 'Col%d %s' % (index, field_type), field_type))
+        self.folders = ['Shared Documents'] + ['Shared Documents/Folder %d' % i for i in range(folders)]
+        self.files = {}
+        for index in range(files):
+            folder = self.folders[index % len(self.folders)]
+            self.files['%s/file%d.bin' % (folder, index)] = file_size
+        self.uploads = {}
+        self.updates = 0
+        # REST POSTs with another X-RequestDigest get a 403, see expire_digest
+        self.digest = '0x00BENCH,01 Jan 2020 00:00:00 -0000'
+        self.digests = 0
+        # The next throttle requests get a 429 with Retry-After: 0
+        self.throttle = 0
+        self._lock = threading.Lock()
+
+    def value(self, item_id, field_type):
+        if field_type == 'Counter':
+            return str(item_id)
+        if field_type == 'Text':
+            return 'Item %d' % item_id
+        if field_type in ('Number', 'Currency'):
+            return '%d.25' % (item_id % 10000)
+        if field_type == 'DateTime':
+            return (EPOCH + timedelta(minutes=item_id)).strftime('%Y-%m-%d %H:%M:%S')
+        if field_type == 'Choice':
+            return CHOICES[item_id % len(CHOICES)]
+        if field_type == 'User':
+            user = item_id % len(USERS)
+            return '%d;#%s' % (user + 1, USERS[user])
+        if field_type == 'Boolean':
+            return str(item_id % 2)
+        return 'Note for item %d with a little more text in it' % item_id
+
+    def row(self, item_id, fields):
+        attributes = ['ows_%s=%s' % (name, quoteattr(self.value(item_id, field_type)))
+                      for name, display, field_type in fields]
+        modified = (EPOCH + timedelta(seconds=item_id)).strftime('%Y-%m-%d %H:%M:%S')
+        attributes.append('ows_Created="2020-01-01 00:00:00" ows_Modified="%s"' % modified)
+        return '<z:row %s />' % ' '.join(attributes)
+
+    def file_data(self, url):
+        size = self.files[url]
+        block = (url.encode('utf-8') + b'\n') * (64 * 1024 // (len(url) + 1) + 1)
+        return block, size
+
+    # SOAP
+
+    def soap(self, service, action, body):
+        """Response of the SOAP action on service, the asmx file name in lower case"""
+        command = etree.fromstring(body)[-1][0]
+        params = {child.tag.replace(SOAP_NS, ''): child for child in command}
+        if service == 'sitedata.asmx':
+            handler, envelope = getattr(self, 'sitedata_' + action, None), SITEDATA_ENVELOPE
+        elif service in ('lists.asmx', 'views.asmx'):
+            handler, envelope = getattr(self, 'soap_' + action, None), ENVELOPE
+        else:
+            handler = None
+        if handler is None:
+            return 500, ENVELOPE.format(action) % ''
+        return 200, envelope.format(action) % handler(params)
+
+    def sitedata_GetListCollection(self, params):
+        return ('<vLists><_sList><InternalName>{00000000-0000-0000-0000-000000000001}</InternalName>'
+                '<Title>%s</Title><BaseType>GenericList</BaseType><BaseTemplate>GenericList</BaseTemplate>'
+                '<ItemCount>%d</ItemCount></_sList></vLists>' % (escape(self.list_name), self.rows))
+
+    def soap_GetList(self, params):
+        fields = ''.join('<Field Name="%s" StaticName="%s" DisplayName="%s" Type="%s" />' % (name, name, display, kind)
+                         for name, display, kind in self.fields)
+        fields += ('<Field Name="Created" StaticName="Created" DisplayName="Created" Type="DateTime" />'
+                   '<Field Name="Modified" StaticName="Modified" DisplayName="Modified" Type="DateTime" />')
+        return ('<List Title="%s" ID="{00000000-0000-0000-0000-000000000001}" Version="%d" ItemCount="%d">'
+                '<Fields>%s</Fields>'
+                '<RegionalSettings><Language>1033</Language><Locale>1033</Locale><TimeZone>0</TimeZone></RegionalSettings>'
+                '<ServerSettings><ServerVersion>16.0.0.0</ServerVersion></ServerSettings></List>'
+                % (escape(self.list_name), self.version, self.rows, fields))
+
+    def soap_GetListCollection(self, params):
+        return ('<Lists><List Title="%s" ID="{00000000-0000-0000-0000-000000000001}" Version="%d" /></Lists>'
+                % (escape(self.list_name), self.version))
+
+    def soap_GetViewCollection(self, params):
+        return ('<Views><View Name="{00000000-0000-0000-0000-0000000000AA}" DisplayName="All Items" '
+                'DefaultView="TRUE" /></Views>')
+
+    def soap_GetView(self, params):
+        fields = ''.join('<FieldRef Name="%s" />' % name for name, display, kind in self.fields)
+        return ('<View Name="{00000000-0000-0000-0000-0000000000AA}" DisplayName="All Items">'
+                '<Query /><ViewFields>%s</ViewFields></View>' % fields)
+
+    def _query(self, params):
+        """Item IDs and fields a GetListItems style request asks for"""
+        low, high = 1, self.rows
+        descending = False
+        query = params.get('query')
+        if query is not None:
+            for operator in query.iter('Geq', 'Gt', 'Leq', 'Lt', 'Eq'):
+                if operator.find('FieldRef').get('Name') != 'ID':
+                    continue
+                value = int(operator.find('Value').text)
+                if operator.tag == 'Geq':
+                    low = max(low, value)
+                elif operator.tag == 'Gt':
+                    low = max(low, value + 1)
+                elif operator.tag == 'Leq':
+                    high = min(high, value)
+                elif operator.tag == 'Lt':
+                    high = min(high, value - 1)
+                else:
+                    low, high = max(low, value), min(high, value)
+            descending = query.find('.//OrderBy/FieldRef[@Ascending="FALSE"]') is not None
+
+        fields = self.fields
+        view_fields = params.get('viewFields')
+        if view_fields is not None:
+            names = set(field.get('Name') for field in view_fields.iter('FieldRef'))
+            if names:
+                fields = [field for field in self.fields if field[0] in names or field[0] == 'ID']
+
+        limit = params.get('rowLimit')
+        limit = int(limit.text) if limit is not None and limit.text else 0
+        start = None
+        options = params.get('queryOptions')
+        if options is not None:
+            paging = options.find('.//Paging')
+            if paging is not None:
+                start = int(paging.get('ListItemCollectionPositionNext').split('=')[-1])
+        return low, high, descending, fields, limit, start
+
+    def soap_GetListItems(self, params):
+        if params['listName'].text in ('UserInfo', 'User Information List'):
+            rows = ''.join('<z:row ows_ID="%d" ows_ImnName=%s ows_Title=%s />' % (i + 1, quoteattr(u), quoteattr(u))
+                           for i, u in enumerate(USERS))
+            return ROWSET % ('<rs:data ItemCount="%d">%s</rs:data>' % (len(USERS), rows))
+
+        low, high, descending, fields, limit, start = self._query(params)
+        if descending:
+            if start is not None:
+                high = min(high, start - 1)
+            ids = range(high, low - 1, -1)
+        else:
+            if start is not None:
+                low = max(low, start + 1)
+            ids = range(low, high + 1)
+        page = ids[:limit] if limit else ids
+        more = ''
+        if limit and len(ids) > limit:
+            more = ' ListItemCollectionPositionNext="Paged=TRUE&amp;p_ID=%d"' % page[-1]
+        rows = ''.join([self.row(item_id, fields) for item_id in page])
+        return ROWSET % ('<rs:data ItemCount="%d"%s>%s</rs:data>' % (len(page), more, rows))
+
+    def soap_GetListItemChangesSinceToken(self, params):
+        token = params.get('changeToken')
+        if token is not None and token.text:
+            # A few updates and a delete since any token
+            changes = '<Changes LastChangeToken="1;3;bench;2"><Id ChangeType="Delete">1</Id></Changes>'
+            ids = range(2, min(self.rows, 50) + 1)
+            more = ''
+        else:
+            low, high, descending, fields, limit, start = self._query(params)
+            changes = '<Changes LastChangeToken="1;3;bench;1" />'
+            ids = range((start or 0) + 1, self.rows + 1)
+            more = ''
+            if limit and len(ids) > limit:
+                ids = ids[:limit]
+                more = ' ListItemCollectionPositionNext="Paged=TRUE&amp;p_ID=%d"' % ids[-1]
+        rows = ''.join([self.row(item_id, self.fields) for item_id in ids])
+        return ROWSET % ('%s<rs:data ItemCount="%d"%s>%s</rs:data>' % (changes, len(ids), more, rows))
+
+    def soap_UpdateListItems(self, params):
+        results = []
+        for method in params['updates'].iter('Method'):
+            item_id = method.find('Field[@Name="ID"]')
+            item_id = item_id.text if item_id is not None else str(self.rows + int(method.get('ID')))
+            results.append('<Result ID="%s,%s"><ErrorCode>0x00000000</ErrorCode>'
+                           '<z:row xmlns:z="#RowsetSchema" ows_ID="%s" /></Result>'
+                           % (method.get('ID'), method.get('Cmd'), item_id))
+        with self._lock:
+            self.updates += len(results)
+        return '<Results>%s</Results>' % ''.join(results)
+
+    def soap_GetAttachmentCollection(self, params):
+        return '<Attachments />'
+
+    # REST
+
+    def contextinfo(self):
+        with self._lock:
+            self.digests += 1
+        return ('<d:GetContextWebInformation xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices">'
+                '<d:FormDigestTimeoutSeconds>1800</d:FormDigestTimeoutSeconds>'
+                '<d:FormDigestValue>%s</d:FormDigestValue>'
+                '</d:GetContextWebInformation>' % self.digest)
+
+    def expire_digest(self):
+        """Reject the digest handed out so far, like SharePoint once it runs out"""
+        self.digest = '0x%02dBENCH,01 Jan 2020 00:00:00 -0000' % (self.digests + 1)
+
+    def _file_entry(self, url):
+        return ('<entry><content type="application/xml"><m:properties>'
+                '<d:Length>%d</d:Length><d:Name>%s</d:Name><d:ServerRelativeUrl>%s</d:ServerRelativeUrl>'
+                '<d:TimeCreated>2020-01-01T00:00:00Z</d:TimeCreated>'
+                '<d:TimeLastModified>2020-01-01T00:00:00Z</d:TimeLastModified>'
+                '<d:ETag>"{%08d},1"</d:ETag></m:properties></content></entry>'
+                % (self.files[url], escape(url.rsplit('/', 1)[-1]), escape(url), sorted(self.files).index(url)))
+
+    def _folder_entry(self, folder):
+        return ('<entry><content type="application/xml"><m:properties><d:Name>%s</d:Name>'
+                '<d:ServerRelativeUrl>%s</d:ServerRelativeUrl></m:properties></content></entry>'
+                % (escape(folder.rsplit('/', 1)[-1]), escape(folder)))
+
+    def folder(self, folder, expand):
+        if folder not in self.folders:
+            return 404, '<error />'
+        files = ''.join(self._file_entry(url) for url in sorted(self.files) if url.rsplit('/', 1)[0] == folder)
+        if expand == '/Files':
+            return 200, '<feed %s>%s</feed>' % (ATOM, files)
+        sub_folders = ''.join(self._folder_entry(sub) for sub in self.folders
+                              if '/' in sub and sub.rsplit('/', 1)[0] == folder)
+        links = ''
+        if 'Files' in expand:
+            links += ('<link rel="http://schemas.microsoft.com/ado/2007/08/dataservices/related/Files" '
+                      'title="Files" href="Files"><m:inline><feed>%s</feed></m:inline></link>' % files)
+        if 'Folders' in expand:
+            links += ('<link rel="http://schemas.microsoft.com/ado/2007/08/dataservices/related/Folders" '
+                      'title="Folders" href="Folders"><m:inline><feed>%s</feed></m:inline></link>' % sub_folders)
+        return 200, ('<entry %s>%s<content type="application/xml"><m:properties><d:Name>%s</d:Name>'
+                     '<d:ServerRelativeUrl>%s</d:ServerRelativeUrl></m:properties></content></entry>'
+                     % (ATOM, links, escape(folder.rsplit('/', 1)[-1]), escape(folder)))
+
+    def add_file(self, folder, name, size):
+        url = '%s/%s' % (folder, name)
+        with self._lock:
+            self.files[url] = size
+        return ('<entry %s><content type="application/xml"><m:properties>'
+                '<d:ServerRelativeUrl>%s</d:ServerRelativeUrl></m:properties></content></entry>' % (ATOM, escape(url)))
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, format, *args):
+        pass
+
+    @property
+    def sharepoint(self):
+        return self.server.sharepoint
+
+    def _send(self, status, body, content_type='text/xml; charset=utf-8', headers=()):
+        if isinstance(body, str):
+            body = body.encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        for name, value in headers:
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _body(self):
+        return self.rfile.read(int(self.headers.get('Content-Length') or 0))
+
+    def _delay(self):
+        if self.sharepoint.latency:
+            time.sleep(self.sharepoint.latency)
+
+    def _throttled(self):
+        """Answer with a 429 if the server is still throttling"""
+        with self.sharepoint._lock:
+            if not self.sharepoint.throttle:
+                return False
+            self.sharepoint.throttle -= 1
+        self._send(429, '<error />', headers=[('Retry-After', '0')])
+        return True
+
+    def do_POST(self):
+        body = self._body()
+        self._delay()
+        if self._throttled():
+            return
+        path = unquote(self.path)
+        action = self.headers.get('SOAPAction')
+        if action:
+            service = path.split('?')[0].rsplit('/', 1)[-1].lower()
+            return self._send(*self.sharepoint.soap(service, action.strip('"').rsplit('/', 1)[-1], body))
+        if path.endswith('/_api/contextinfo'):
+            return self._send(200, self.sharepoint.contextinfo())
+        if self.headers.get('X-RequestDigest') != self.sharepoint.digest:
+            return self._send(403, '<error />')
+        match = re.search(r"GetFolderByServerRelativeUrl\('(.*?)'\)/Files/add\(url='(.*?)',overwrite=\w+\)$", path)
+        if match:
+            folder, name = match.groups()
+            return self._send(200, self.sharepoint.add_file(folder, name.replace("''", "'"), len(body)))
+        match = re.search(r"GetFileByServerRelativeUrl\('(.*?)'\)/(\w+)Upload\(uploadId=guid'(.*?)'", path)
+        if match:
+            url, step, upload_id = match.groups()
+            with self.sharepoint._lock:
+                size = self.sharepoint.uploads.pop(upload_id, 0) + len(body)
+                if step == 'Finish':
+                    self.sharepoint.files[url.replace("''", "'")] = size
+                elif step != 'Cancel':
+                    self.sharepoint.uploads[upload_id] = size
+            return self._send(200, '<d:Offset xmlns:d="http://schemas.microsoft.com/ado/2007/08/dataservices">'
+                                   '%d</d:Offset>' % size)
+        self._send(404, '<error />')
+
+    def do_GET(self):
+        self._delay()
+        if self._throttled():
+            return
+        path = unquote(self.path)
+        match = re.search(r"GetFolderByServerRelativeUrl\('(.*?)'\)(.*)$", path)
+        if match:
+            return self._send(*self.sharepoint.folder(*match.groups()))
+        match = re.search(r"GetFileByServerRelativeUrl\('(.*?)'\)/\$value$", path)
+        if match and match.group(1) in self.sharepoint.files:
+            block, size = self.sharepoint.file_data(match.group(1))
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/octet-stream')
+            self.send_header('Content-Length', str(size))
+            self.end_headers()
+            sent = 0
+            while sent < size:
+                chunk = block[:size - sent]
+                self.wfile.write(chunk)
+                sent += len(chunk)
+            return
+        self._send(404, '<error />')
+
+
+class FakeServer(ThreadingMixIn, HTTPServer):
+    daemon_threads = True
+
+
+def serve(sharepoint=None, port=0):
+    """Start the fake server in a background thread
+
+       Returns the server and the Site url to use, stop it with server.shutdown()
+    """
+    server = FakeServer(('127.0.0.1', port), Handler)
+    server.sharepoint = sharepoint or FakeSharePoint()
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server, 'http://127.0.0.1:%d/sites/bench' % server.server_address[1]
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serve a fake SharePoint site')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--rows', type=int, default=10000)
+    parser.add_argument('--width', type=int, default=10)
+    parser.add_argument('--latency', type=float, default=0.0)
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--file-size', type=int, default=1024 * 1024)
+    args = parser.parse_args()
+    sharepoint = FakeSharePoint(args.rows, args.width, args.latency, args.files, args.file_size)
+    server, url = serve(sharepoint, args.port)
+    print('Serving %s, List %r, Ctrl+C to stop' % (url, sharepoint.list_name))
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+# SharePlum benchmarks
+# Runs the client against benchmarks/fake_server.py and reports
+# throughput and peak Python memory for each benchmark.
+#
+#   python benchmarks/run.py --rows 50000 --width 20
+#   python benchmarks/run.py --only fetch,convert --json results.json
+#
+# Compare two runs by saving --json before and after a change.
+# Python 3 only.
+
+import argparse
+import gc
+import io
+import json
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from shareplum import Site, ListDict  # noqa: E402
+from fake_server import FakeSharePoint, serve  # noqa: E402
+
+
+class _Body(object):
+    """Enough of a requests response for _List._stream_list_items"""
+
+    def __init__(self, content):
+        self.raw = io.BytesIO(content)
+        self.raw.decode_content = True
+
+    def close(self):
+        pass
+
+
+def measure(function, repeat):
+    """Best wall time of repeat runs and the peak memory of one more traced run
+       tracemalloc slows allocations down, so it is kept out of the timed runs.
+    """
+    best = None
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = function()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+        del result
+    gc.collect()
+    tracemalloc.start()
+    result = function()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    del result
+    return best, peak
+
+
+def _serve(options, queue):
+    server, url = serve(FakeSharePoint(*options))
+    queue.put(url)
+    while True:
+        time.sleep(3600)
+
+
+def start_server(options):
+    """Run the fake server in its own process so it doesn't share the
+       benchmark's CPU time, GIL or traced memory
+    """
+    queue = multiprocessing.Queue()
+    process = multiprocessing.Process(target=_serve, args=(options, queue))
+    process.daemon = True
+    process.start()
+    return process, queue.get(timeout=30)
+
+
+class Benchmarks(object):
+
+    def __init__(self, url, sharepoint, args):
+        self.url = url
+        self.sharepoint = sharepoint
+        self.args = args
+        self.site = Site(url, pool_maxsize=16)
+        self.sp_list = self.site.List(sharepoint.list_name)
+        self.rows = sharepoint.rows
+
+    # Each returns (callable, units, unit name)
+
+    def fetch(self):
+        return (lambda: self.sp_list.GetListItems()), self.rows, 'rows'
+
+    def fetch_paged(self):
+        return (lambda: list(self.sp_list.IterListItems(page_size=5000))), self.rows, 'rows'
+
+    def fetch_parallel(self):
+        return (lambda: self.sp_list.GetListItems(parallel=4)), self.rows, 'rows'
+
+    def fetch_columns(self):
+        return (lambda: self.sp_list.GetListItems(as_columns=True)), self.rows, 'rows'
+
+    def _raw_page(self):
+        soap_request, viewfields = self.sp_list._build_list_items_request()
+        response = self.site._session.post(self.sp_list._url('Lists'),
+                                           headers=self.sp_list._headers('GetListItems'),
+                                           data=soap_request.to_bytes())
+        return response.content, viewfields
+
+    def parse(self):
+        """lxml parsing alone, no conversion"""
+        from lxml import etree
+        content, viewfields = self._raw_page()
+
+        def run():
+            count = 0
+            for event, element in etree.iterparse(io.BytesIO(content), tag='{#RowsetSchema}row'):
+                count += 1
+                element.clear()
+            return count
+        return run, self.rows, 'rows'
+
+    def convert(self):
+        """Parsing and conversion without the network"""
+        content, viewfields = self._raw_page()
+
+        def run():
+            rows = self.sp_list._stream_list_items(_Body(content), viewfields)
+            next(rows, None)
+            return list(rows)
+        return run, self.rows, 'rows'
+
+    def diff(self):
+        old = self.sp_list.GetListItems()
+        new = [dict(row) for row in old]
+        for row in new[::10]:
+            row['Title'] = row['Title'] + ' changed'
+        columns = [name for name in old[0] if name != 'ID']
+        return (lambda: ListDict.reconcile(new, old, 'ID', columns, 'ID')), len(old), 'rows'
+
+    def update(self):
+        count = min(self.rows, self.args.update_rows)
+        data = [{'Title': 'New item %d' % i} for i in range(count)]
+        return (lambda: self.sp_list.UpdateListItems(data, 'New', chunk_size=500, threads=4)), count, 'rows'
+
+    def download(self):
+        directory = tempfile.mkdtemp(prefix='shareplum-bench-')
+        docs = self.site.Documents('Shared Documents')
+        size = sum(self.sharepoint.files.values()) / 1024.0 / 1024.0
+
+        def run():
+            result = docs.GetAllFilesInFolder(directory, include_sub_folders=True, workers=4)
+            shutil.rmtree(directory, ignore_errors=True)
+            return result
+        return run, size, 'MB'
+
+    def upload(self):
+        docs = self.site.Documents('Shared Documents')
+        size = self.args.upload_size
+        data = b'\0' * size
+
+        def run():
+            return docs.UploadFile(io.BytesIO(data), 'upload.bin', chunk_size=4 * 1024 * 1024)
+        return run, size / 1024.0 / 1024.0, 'MB'
+
+
+ALL = ['fetch', 'fetch_paged', 'fetch_parallel', 'fetch_columns', 'parse', 'convert', 'diff', 'update',
+       'download', 'upload']
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark SharePlum against a local fake SharePoint')
+    parser.add_argument('--rows', type=int, default=20000)
+    parser.add_argument('--width', type=int, default=12)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds added to every response')
+    parser.add_argument('--files', type=int, default=20)
+    parser.add_argument('--file-size', type=int, default=2 * 1024 * 1024)
+    parser.add_argument('--update-rows', type=int, default=5000)
+    parser.add_argument('--upload-size', type=int, default=16 * 1024 * 1024)
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--only', help='comma separated benchmarks, from: ' + ', '.join(ALL))
+    parser.add_argument('--json', help='also write the results to this file')
+    args = parser.parse_args()
+
+    options = (args.rows, args.width, args.latency, args.files, args.file_size)
+    # The same content as the server's, to know the sizes
+    sharepoint = FakeSharePoint(*options)
+    process, url = start_server(options)
+    benchmarks = Benchmarks(url, sharepoint, args)
+    names = args.only.split(',') if args.only else ALL
+
+    print('%d rows x %d columns, %.3fs latency, Python %s' % (args.rows, args.width, args.latency,
+                                                             sys.version.split()[0]))
+    print('%-16s %10s %16s %12s' % ('benchmark', 'seconds', 'throughput', 'peak MB'))
+    results = {}
+    try:
+        for name in names:
+            function, units, unit = getattr(benchmarks, name)()
+            elapsed, peak = measure(function, args.repeat)
+            results[name] = {'seconds': elapsed, 'units': units, 'unit': unit,
+                             'per_second': units / elapsed, 'peak_bytes': peak}
+            print('%-16s %10.3f %11.0f %s/s %12.1f' % (name, elapsed, units / elapsed, unit.ljust(4),
+                                                       peak / 1024.0 / 1024.0))
+    finally:
+        process.terminate()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=1)
+
+
+if __name__ == '__main__':
+    main()
@@ -40,5 +40,9 @@ setup(
     ],
     keywords=['SharePoint'],
     packages=['shareplum'],
-    install_requires=['lxml', 'requests', 'requests-ntlm', 'requests-toolbelt'],
+    install_requires=['lxml', 'requests', 'requests-ntlm', 'requests-toolbelt',
+                      'futures; python_version < "3"'],
+    extras_require={'async': ['aiohttp'],
+                    'prometheus': ['prometheus_client'],
+                    'opentelemetry': ['opentelemetry-api']},
 )
@@ -1,6 +1,9 @@
 # This is a group of small functions
 # used to work with a list of dictionaries
 
+# Stands in for a missing column so it can't be mistaken for a real value
+_MISSING = object()
+
 def changes(new_cmp_dict, old_cmp_dict, id_column, columns):
     """Return a list dict of the changes of the
        rows that exist in both dictionaries
@@ -64,3 +67,78 @@ def full_dict(ldict, keys):
         cmp_dict[index] = line
 
     return cmp_dict
+
+def _values(line, columns):
+    """The row's values in columns, _MISSING for the ones it lacks"""
+    return tuple([line.get(column, _MISSING) for column in columns])
+
+def _id(line, id_column):
+    """The row's id_column value"""
+    try:
+        return line[id_column]
+    except KeyError:
+        raise KeyError("Input Dictionary 'old_ldict' must have ID column %r" % (id_column,))
+
+def reconcile(new_ldict, old_ldict, keys, columns, id_column=None):
+    """Compare two list dicts in one pass
+       keys: a list of keys that when
+       combined make the row in the list unique
+       columns: the columns to compare
+
+       Returns a dict with
+           changes: like changes(), ready for UpdateListItems kind='Update'
+           unique: like unique(), rows to add with kind='New'
+           deleted: old rows missing from new_ldict, just their
+                    id_column values if given for kind='Delete'
+
+       Old rows are indexed by their key tuple with a tuple of
+       their values in columns, so only rows whose values differ
+       are compared column by column.
+       Raises KeyError if an old row that changed or was deleted
+       has no id_column.
+    """
+    if type(keys) == str:
+        keys = [keys]
+    columns = list(columns)
+
+    if len(keys) == 1:
+        key = keys[0]
+        row_key = lambda line: str(line.get(key, ''))
+    else:
+        row_key = lambda line: tuple([str(line.get(key, '')) for key in keys])
+
+    old_rows = list(old_ldict)
+    old_index = {}
+    old_values = []
+    for index, line in enumerate(old_rows):
+        old_index[row_key(line)] = index
+        old_values.append(_values(line, columns))
+
+    seen = bytearray(len(old_rows))
+    update_ldict = []
+    unique_ldict = []
+    for line in new_ldict:
+        index = old_index.get(row_key(line))
+        if index is None:
+            unique_ldict.append(line)
+            continue
+        seen[index] = 1
+        if _values(line, columns) == old_values[index]:
+            continue
+
+        old_dict = old_rows[index]
+        update_dict = {}
+        for dict_key in columns:
+            new_val = line.get(dict_key, _MISSING)
+            if new_val is not _MISSING and new_val != old_dict.get(dict_key, _MISSING):
+                update_dict[dict_key] = new_val
+        if update_dict:
+            if id_column != None:
+                update_dict[id_column] = _id(old_dict, id_column)
+            update_ldict.append(update_dict)
+
+    deleted = [old_rows[index] for index in range(len(old_rows)) if not seen[index]]
+    if id_column != None:
+        deleted = [_id(line, id_column) for line in deleted]
+
+    return {'changes': update_ldict, 'unique': unique_ldict, 'deleted': deleted}
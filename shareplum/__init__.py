@@ -8,4 +8,6 @@ __author__ = 'Jason Rollins'
 
 from .shareplum import *
 from .ListDict import *
+from .cache import SchemaCache
+from .metrics import RequestMetrics, LoggingHook, PrometheusHook, OpenTelemetryHook
 from .version import __version__
@@ -0,0 +1,782 @@
+# asyncio versions of Site, List and Documents
+# They build requests and parse responses with the same
+# code as the synchronous objects and only await the I/O.
+# Requires Python 3 and aiohttp.
+
+import asyncio
+import os
+import re
+import time
+import uuid
+
+from lxml import etree
+from requests.exceptions import HTTPError
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from .shareplum import (Site, _List, _Documents, _Sync, _bulk_rows, _drop_element, _local_path, _merge_pages,
+                        _part_file, _read_chunks, _update_chunks, soap)
+from .metrics import RequestMetrics, request_action, timer
+from .throttle import THROTTLE_STATUS, RateLimiter, ThrottleStats, retry_delay
+from .version import __version__
+
+
+class AsyncSite(Site):
+    """Connect to SharePoint Site from an asyncio event loop
+
+       site = AsyncSite(url, authcookie=authcookie)
+       sp_list = await site.List('list name')
+       data = await sp_list.GetListItems()
+       await site.close()
+
+       auth must be an aiohttp auth object such as aiohttp.BasicAuth,
+       requests auth objects like HttpNtlmAuth can't be used here.
+       At most max_concurrency requests are sent at the same time.
+       Throttled requests are tried again like with Site.
+       Metrics hooks get the network figures of each request,
+       parse and convert times aren't measured here.
+    """
+
+    def __init__(self, site_url, auth=None, authcookie=None, verify_ssl=True, huge_tree=False, timeout=None,
+                 max_concurrency=10, throttle_retries=5, max_rate=None, metric_hooks=None):
+        if aiohttp is None:
+            raise ImportError('AsyncSite requires aiohttp')
+        self.site_url = site_url
+        self._verify_ssl = verify_ssl
+        self._auth = auth
+        # Office365.GetCookies returns a RequestsCookieJar
+        self._cookies = {cookie.name: cookie.value for cookie in authcookie} if authcookie is not None else None
+
+        self.huge_tree = huge_tree
+
+        self.timeout = timeout
+
+        self.last_request = None
+
+        self.xml_headers = {'accept': 'application/atom+xml'}
+
+        self._session = None
+        # Made with the session, before Python 3.10 it binds to the loop current when it is made
+        self._semaphore = None
+        self._max_concurrency = max_concurrency
+        # Request digest shared by every AsyncDocuments, see _get_request_digest
+        self._digest = None
+        self._digest_expires = 0
+        self._digest_lock = None
+        self._throttle_retries = throttle_retries
+        self._limiter = RateLimiter(max_rate)
+        self._stats = ThrottleStats()
+        self._metric_hooks = list(metric_hooks or [])
+
+        # Users are looked up as UpdateListItems needs them, see users
+        self._users = {'py': {}, 'sp': {}}
+        # Loading AsyncLists by (listName, exclude_hidden_fields), see List
+        self._lists = {}
+
+    @property
+    def users(self):
+        """Users looked up so far
+           Only the users UpdateListItems writes are looked up, one request each,
+           attribute access can't wait on a request.  Use 'await GetUsers()' for all of them.
+        """
+        return self._users
+
+    @property
+    def throttle_stats(self):
+        """Requests sent, throttled and retried, seconds waited and the current rate limit"""
+        stats = self._stats.as_dict()
+        stats['rate'] = self._limiter.rate
+        return stats
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def close(self):
+        """Close the underlying aiohttp session"""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        self._semaphore = None
+        self._digest_lock = None
+
+    def _get_session(self):
+        # aiohttp sessions have to be created inside the running loop
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._max_concurrency)
+            self._digest_lock = asyncio.Lock()
+        if self._session is None:
+            self._session = aiohttp.ClientSession(auth=self._auth,
+                                                  cookies=self._cookies,
+                                                  headers={'user-agent': 'shareplum/%s' % __version__},
+                                                  timeout=aiohttp.ClientTimeout(total=self.timeout))
+        return self._session
+
+    async def _request(self, method, url, headers=None, data=None, on_chunk=None, response_headers=None):
+        """Send a request and return the status and body
+           With on_chunk the body is handed over piece by piece
+           as it arrives instead of being returned
+           response_headers, a dict, gets the headers of the response
+        """
+        session = self._get_session()
+        metrics = None
+        if self._metric_hooks:
+            metrics = RequestMetrics(list(self._metric_hooks), request_action(url, headers), method, url)
+            metrics.bytes_sent = len(data) if hasattr(data, '__len__') else 0
+            start = timer()
+        attempt = 0
+        while True:
+            wait = self._limiter.reserve()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            async with self._semaphore:
+                sent = timer() if metrics is not None else 0.0
+                async with session.request(method, url, headers=headers, data=data,
+                                           ssl=None if self._verify_ssl else False) as response:
+                    self._stats.add(requests=1, waited=wait)
+                    if response.status in THROTTLE_STATUS:
+                        self._stats.add(throttled=1)
+                        delay = retry_delay(response.headers, attempt)
+                        self._limiter.throttled(delay)
+                        if attempt < self._throttle_retries:
+                            attempt += 1
+                            self._stats.add(retries=1)
+                            continue
+                    else:
+                        self._limiter.succeeded()
+                    if response_headers is not None:
+                        response_headers.update(response.headers)
+                    if metrics is not None:
+                        metrics.status = response.status
+                        metrics.retries = attempt
+                        metrics.server_time = timer() - sent
+                    if on_chunk is None or response.status != 200:
+                        body = await response.read()
+                        if metrics is not None:
+                            metrics.bytes_received = len(body)
+                            metrics.total_time = timer() - start
+                            metrics.emit()
+                        return response.status, body
+                    received = 0
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        on_chunk(chunk)
+                        received += len(chunk)
+                    if metrics is not None:
+                        metrics.bytes_received = received
+                        metrics.total_time = timer() - start
+                        metrics.emit()
+                    return response.status, None
+
+    async def _post_soap(self, service, command, soap_request):
+        """Send a SOAP request and return the parsed envelope"""
+        self.last_request = soap_request
+        status, body = await self._request('POST', self._url(service),
+                                           headers=self._headers(command),
+                                           data=soap_request.to_bytes())
+        if status != 200:
+            raise HTTPError('%s request failed: %s' % (command, status))
+        return etree.fromstring(body, parser=etree.XMLParser(huge_tree=self.huge_tree))
+
+    async def _get_request_digest(self, stale=None):
+        """
+        Grabs the request digest which needs to be added for authentication on every rest api request
+        See Site._get_request_digest
+        """
+        self._get_session()
+        async with self._digest_lock:
+            if self._digest is not None and self._digest != stale and time.time() < self._digest_expires:
+                return self._digest
+            status, body = await self._request('POST', self._url('RequestDigest'), headers=self.xml_headers)
+            if status != 200:
+                raise Exception("Error Authenticating or getting Request Digest ")
+            xmlObj = etree.fromstring(body, parser=etree.XMLParser(huge_tree=self.huge_tree))
+            self._digest = self._parse_request_digest(xmlObj)
+            self._digest_expires = time.time() + self._parse_digest_timeout(xmlObj) - self._digest_margin
+            return self._digest
+
+    async def AddList(self, listName, description, templateID):
+        """Create a new List"""
+        await self._post_soap('Lists', 'AddList', self._build_add_list_request(listName, description, templateID))
+
+    async def DeleteList(self, listName):
+        """Delete a List with given name"""
+        soap_request = soap('DeleteList')
+        soap_request.add_parameter('listName', listName)
+        await self._post_soap('Lists', 'DeleteList', soap_request)
+
+    async def GetListCollection(self):
+        """Returns List information for current Site"""
+        envelope = await self._post_soap('SiteData', 'GetListCollection', soap('GetListCollection'))
+        return self._parse_list_collection(envelope)
+
+    async def GetUsers(self, rowlimit=0):
+        """Get Items from current list
+           rowlimit defaulted to 0 (no limit)
+        """
+        envelope = await self._post_soap('Lists', 'GetListItems', self._build_users_request(rowlimit))
+        return self._parse_users(envelope)
+
+    async def _get_user(self, name):
+        """Look up a single user by name and add it to the user maps"""
+        users = self._parse_users(await self._post_soap('Lists', 'GetListItems', self._build_user_request(name)))
+        self._users['py'].update(users['py'])
+        self._users['sp'].update(users['sp'])
+
+    async def _load_users(self, names):
+        """Look up the names that haven't been seen yet"""
+        await asyncio.gather(*[self._get_user(name) for name in set(names)
+                               if name and name not in self._users['py']])
+
+    # SharePoint Method Objects
+    async def List(self, listName, exclude_hidden_fields=False):
+        """Sharepoint Lists Web Service
+           Returns an AsyncList with its schema and views loaded
+           They are loaded once per AsyncSite, later calls for the
+           same List return the same AsyncList.
+           Run 'await sp_list.GetList()' to reload the fields.
+        """
+        key = (listName, exclude_hidden_fields)
+        if key not in self._lists:
+            self._lists[key] = asyncio.ensure_future(self._load_list(key))
+        # One caller giving up mustn't cancel the load the others wait on
+        return await asyncio.shield(self._lists[key])
+
+    async def _load_list(self, key):
+        _list = AsyncList(self, *key)
+        try:
+            await asyncio.gather(_list.GetList(), _list._load_views())
+        except BaseException:
+            # Try again on the next List call
+            del self._lists[key]
+            raise
+        return _list
+
+    async def Documents(self, folder):
+        """
+        Wrapper for interacting with Share Point Rest Api for Document Library Content
+        """
+        return AsyncDocuments(self, folder, await self._get_request_digest())
+
+
+class AsyncList(_List):
+    """Sharepoint Lists Web Service for asyncio
+       Created with 'await AsyncSite.List()'.
+       Every method of List is a coroutine here.
+    """
+
+    def __init__(self, site, listName, exclude_hidden_fields=False):
+        self._site = site
+        self.listName = listName
+        self._url = site._url
+        self._verify_ssl = site._verify_ssl
+        self.users = site.users
+        self.huge_tree = site.huge_tree
+        self.timeout = site.timeout
+        self._exclude_hidden_fields = exclude_hidden_fields
+        # List Info
+        self.fields = []
+        self.regional_settings = {}
+        self.server_settings = {}
+        self.views = {}
+        self._converters = {}
+        self._row_converters = {}
+        self.last_request = None
+        self.date_format = re.compile(r'\d+-\d+-\d+ \d+:\d+:\d+')
+
+    async def _post_soap(self, service, command, soap_request):
+        self.last_request = soap_request
+        return await self._site._post_soap(service, command, soap_request)
+
+    async def _load_views(self):
+        self.views = await self.GetViewCollection()
+
+    async def _get_page(self, viewname, fields, query, rowlimit, position=None, viewfields=None, as_columns=False):
+        """Fetch one page of GetListItems
+           Returns the converted rows, or a ListColumns with as_columns,
+           the next page position and the viewfields
+        """
+        if viewname and not fields and viewfields is None:
+            viewfields = (await self.GetView(viewname))['fields']
+        soap_request, viewfields = self._build_list_items_request(viewname, fields, query, rowlimit, position, viewfields)
+        self.last_request = soap_request
+
+        rows = self._new_columns(viewfields) if as_columns else []
+        page = {}
+        parser = etree.XMLPullParser(events=('start', 'end'),
+                                     tag=('{urn:schemas-microsoft-com:rowset}data', '{#RowsetSchema}row'),
+                                     huge_tree=self.huge_tree)
+
+        def on_chunk(chunk):
+            parser.feed(chunk)
+            for event, element in parser.read_events():
+                if element.tag == '{urn:schemas-microsoft-com:rowset}data':
+                    if event == 'start':
+                        page['position'] = element.get('ListItemCollectionPositionNext')
+                elif event == 'end':
+                    if as_columns:
+                        rows.append(element)
+                        _drop_element(element)
+                    else:
+                        rows.append(self._pop_row(element, viewfields))
+
+        status, body = await self._site._request('POST', self._url('Lists'),
+                                                 headers=self._headers('GetListItems'),
+                                                 data=soap_request.to_bytes(),
+                                                 on_chunk=on_chunk)
+        if status != 200:
+            raise HTTPError('GetListItems request failed: %s' % status)
+        parser.close()
+        return rows, page.get('position'), viewfields
+
+    async def GetListItems(self, viewname=None, fields=None, query=None, rowlimit=0, parallel=None, as_columns=False):
+        """Get Items from current list
+           rowlimit defaulted to 0 (unlimited)
+           parallel splits the list into that many ID ranges
+           and fetches them at the same time, see List.GetListItems
+           as_columns returns a ListColumns, see List.GetListItems
+        """
+        if parallel and parallel > 1 and self._splits(viewname, query, rowlimit):
+            return await self._get_list_items_parallel(fields, query, parallel, as_columns)
+        rows, position, viewfields = await self._get_page(viewname, fields, query, rowlimit, as_columns=as_columns)
+        return rows
+
+    async def IterListItems(self, viewname=None, fields=None, query=None, page_size=1000):
+        """Get Items from current list one page at a time
+           Async generator, use 'async for row in sp_list.IterListItems()'
+        """
+        position = None
+        viewfields = None
+        while True:
+            rows, position, viewfields = await self._get_page(viewname, fields, query, page_size, position, viewfields)
+            for row in rows:
+                yield row
+            if not position:
+                break
+
+    async def _get_columns(self, viewname, fields, query, page_size):
+        """Page through the list into one ListColumns"""
+        columns = None
+        position = None
+        viewfields = None
+        while True:
+            page, position, viewfields = await self._get_page(viewname, fields, query, page_size, position, viewfields,
+                                                              as_columns=True)
+            if columns is None:
+                columns = page
+            else:
+                columns.extend(page)
+            if not position:
+                return columns
+
+    async def _max_id(self):
+        """Highest item ID in the current list"""
+        rows, position, viewfields = await self._get_page(None, ['ID'], {'OrderBy': [('ID', 'DESCENDING')]}, 1)
+        return int(rows[0]['ID']) if rows else 0
+
+    async def _get_list_items_parallel(self, fields, query, parallel, as_columns=False):
+        """Split the ID space into ranges and fetch them concurrently"""
+        max_id = await self._max_id()
+        if not max_id:
+            if as_columns:
+                return self._new_columns(self._build_list_items_request(None, fields, query)[1])
+            return []
+        fields, range_queries = self._range_queries(fields, query, max_id, parallel)
+
+        async def fetch(range_query):
+            if as_columns:
+                return await self._get_columns(None, fields, range_query, 5000)
+            return [row async for row in self.IterListItems(None, fields, range_query, page_size=5000)]
+
+        pages = await asyncio.gather(*[fetch(range_query) for range_query in range_queries])
+        return _merge_pages(pages, as_columns)
+
+    async def GetList(self):
+        """Get Info on Current List
+           This is run when the List is created so you
+           don't have to run it again.
+        """
+        soap_request = soap('GetList')
+        soap_request.add_parameter('listName', self.listName)
+        self._parse_list(await self._post_soap('Lists', 'GetList', soap_request))
+
+    async def GetView(self, viewname):
+        """Get Info on View Name
+        """
+        if viewname == None:
+            views = await self.GetViewCollection()
+            for view in views:
+                if views[view].get('DefaultView') == 'TRUE':
+                    viewname = view
+                    break
+        envelope = await self._post_soap('Views', 'GetView', self._build_view_request(viewname))
+        return self._parse_view(envelope)
+
+    async def GetViewCollection(self):
+        """Get Views for Current List
+           This is run when the List is created so you
+           don't have to run it again.
+        """
+        soap_request = soap('GetViewCollection')
+        soap_request.add_parameter('listName', self.listName)
+        return self._parse_view_collection(await self._post_soap('Views', 'GetViewCollection', soap_request))
+
+    async def UpdateListItems(self, data, kind, chunk_size=500):
+        """Update List Items
+           kind = 'New', 'Update', or 'Delete'
+           Takes the same data as List.UpdateListItems.
+           Batches are sent concurrently, limited by the
+           Site's max_concurrency.
+        """
+        if type(data) != list:
+            raise Exception('data must be a list of dictionaries')
+        if kind != 'Delete':
+            await self._site._load_users(value for row in data for key, value in row.items()
+                                         if key in self._disp_cols and self._disp_cols[key]['type'] == 'User')
+            self._convert_to_internal(data)
+
+        chunks = _update_chunks(data, chunk_size)
+
+        async def send(chunk):
+            start, rows = chunk
+            soap_request = self._build_update_request(rows, kind, start + 1)
+            return self._parse_update_results(await self._post_soap('Lists', 'UpdateListItems', soap_request))
+
+        data = {}
+        for results in await asyncio.gather(*[send(chunk) for chunk in chunks]):
+            data.update(results)
+        return data
+
+    async def GetAttachmentCollection(self, _id):
+        """Get Attachments for given List Item ID"""
+        soap_request = soap('GetAttachmentCollection')
+        soap_request.add_parameter('listName', self.listName)
+        soap_request.add_parameter('listItemID', _id)
+        return self._parse_attachments(await self._post_soap('Lists', 'GetAttachmentCollection', soap_request))
+
+    async def GetChanges(self, token=None, viewname=None, fields=None, query=None, page_size=1000):
+        """Get the Items that changed since token
+           Returns {'added': [rows], 'updated': [rows], 'deleted': [IDs], 'token': new token}
+           See List.GetChanges
+        """
+        changes = {'added': [], 'updated': [], 'deleted': [], 'token': token}
+        fields, query, extra = self._changes_fields(fields, query)
+        request_token = token
+        position = None
+        viewfields = None
+        while True:
+            if viewname and not fields and viewfields is None:
+                viewfields = (await self.GetView(viewname))['fields']
+            soap_request, viewfields = self._build_list_items_request(viewname, fields, query, page_size, position,
+                                                                      viewfields, 'GetListItemChangesSinceToken')
+            rowfields = [key for key in viewfields if key not in extra]
+            if request_token:
+                soap_request.add_parameter('changeToken', request_token)
+            self.last_request = soap_request
+
+            page = {'first': position is None, 'position': None, 'more': False}
+            parser = etree.XMLPullParser(events=('start', 'end'), tag=self._changes_tags, huge_tree=self.huge_tree)
+
+            def on_chunk(chunk):
+                parser.feed(chunk)
+                self._read_changes(parser.read_events(), changes, token, page,
+                                   lambda element: self._pop_row(element, rowfields))
+
+            status, body = await self._site._request('POST', self._url('Lists'),
+                                                     headers=self._headers('GetListItemChangesSinceToken'),
+                                                     data=soap_request.to_bytes(),
+                                                     on_chunk=on_chunk)
+            if status != 200:
+                raise HTTPError('GetListItemChangesSinceToken request failed: %s' % status)
+            parser.close()
+
+            # Page through this token's items before asking for the next changes
+            position = page['position']
+            if not position:
+                if not page['more']:
+                    break
+                request_token = changes['token']
+
+        return changes
+
+    async def BulkInsert(self, data, chunk_size=500):
+        """Add new List Items
+           Takes the same data as List.BulkInsert.
+           Batches are sent concurrently, limited by the
+           Site's max_concurrency, while the next ones are written.
+           Returns {'Method ID': result} like UpdateListItems.
+        """
+        chunk_size = int(chunk_size) if chunk_size else 500
+        encode_row = self._row_encoder()
+        user_columns = set(key for key in self._disp_cols if self._disp_cols[key]['type'] == 'User')
+        results = {}
+
+        async def send(request):
+            results.update(self._parse_update_results(await self._post_soap('Lists', 'UpdateListItems', request)))
+
+        async def add(chunk, start):
+            # The users have to be looked up before the rows are written
+            await self._site._load_users(value for pairs in chunk for key, value in pairs if key in user_columns)
+            for request in self._bulk_requests(chunk, encode_row, chunk_size, start):
+                pending.add(asyncio.ensure_future(send(request)))
+
+        pending = set()
+        chunk = []
+        start = 1
+        try:
+            for pairs in _bulk_rows(data):
+                chunk.append(list(pairs))
+                if len(chunk) < chunk_size:
+                    continue
+                await add(chunk, start)
+                start += len(chunk)
+                chunk = []
+                # Don't write batches much faster than they can be sent
+                while len(pending) >= self._site._max_concurrency:
+                    done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                    for task in done:
+                        task.result()
+            if chunk:
+                await add(chunk, start)
+            if pending:
+                await asyncio.gather(*pending)
+        except BaseException:
+            for task in pending:
+                task.cancel()
+            raise
+        return results
+
+
+class AsyncDocuments(_Documents):
+    """
+    Share Point Rest Api for Document Library Content for asyncio
+    Created with 'await AsyncSite.Documents()'.
+    """
+
+    def __init__(self, site, folder, request_digest):
+        _Documents.__init__(self, None, folder, site._url, site._verify_ssl, site.timeout, site.huge_tree,
+                            request_digest)
+        self._site = site
+
+    async def _post(self, url, data):
+        """POST with the Site's current digest, once more with a new one after a 403"""
+        self._request_digest = await self._site._get_request_digest()
+        status, body = await self._site._request('POST', url, headers=self.rest_api_headers, data=data)
+        if status == 403:
+            # The digest may have run out, try once more with a new one
+            self._request_digest = await self._site._get_request_digest(stale=self._request_digest)
+            status, body = await self._site._request('POST', url, headers=self.rest_api_headers, data=data)
+        return status, body
+
+    async def _get_xml(self, url):
+        status, body = await self._site._request('GET', url, headers=self.rest_api_headers)
+        if status != 200:
+            raise HTTPError('%s request failed: %s' % (url, status))
+        return etree.fromstring(body, parser=etree.XMLParser(huge_tree=self.huge_tree))
+
+    async def GetSubFolders(self):
+        """
+        Get's sub folders of initialized Folder in Document Object
+        """
+        return self._parse_sub_folders(await self._get_xml(
+            "%sGetFolderByServerRelativeUrl('%s')?$expand=Folders" % (self._url('RestWeb'), self.folder)))
+
+    async def Walk(self, folder_name=None):
+        """
+        Walks the whole folder tree, listing folders concurrently
+        Each folder is yielded as soon as it is listed, see _Documents.Walk
+        :param folder_name: Share Point Folder name or Relative url to start from, defaults to the initialized Folder
+        :return: Async generator of {"folderName", "folderUrl", "path", "files", "folders"}
+        """
+        if folder_name is None: folder_name = self.folder
+        pending = {asyncio.ensure_future(self._list_folder(folder_name)): ()}
+        try:
+            while pending:
+                done, not_done = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    path = pending.pop(task)
+                    folder = task.result()
+                    folder['path'] = '/'.join(path)
+                    for sub_folder in folder['folders']:
+                        pending[asyncio.ensure_future(self._list_folder(sub_folder['folderUrl']))] = \
+                            path + (sub_folder['folderName'],)
+                    yield folder
+        finally:
+            for task in pending:
+                task.cancel()
+
+    async def _list_folder(self, folder_name):
+        return self._parse_folder(await self._get_xml(
+            "%sGetFolderByServerRelativeUrl('%s')?$expand=Files,Folders" % (self._url('RestWeb'), folder_name)))
+
+    async def GetDocumentFolderFileNames(self, folder_name=None):
+        """
+        Get all of the file names in a folder
+        :param folder_name: Share Point Folder name or Relative url of the Share Point folder
+        :return: Dict of File names and File's Relative url's
+        """
+        folder_to_use = folder_name
+        if folder_name is None: folder_to_use = self.folder
+        return self._parse_file_names(await self._get_xml(
+            "%sGetFolderByServerRelativeUrl('%s')/Files" % (self._url('RestWeb'), folder_to_use)))
+
+    async def GetFileByRelativeUrl(self, relative_url, file_name, directory_to_save):
+        """
+        Down loads a single file, writing it to a temporary file as it
+        arrives and renaming it into place once complete
+        :param relative_url: Share Point File relative url
+        :param file_name: The name the file is saved as in Share Point
+        :param directory_to_save: Local Directory to save the file to
+        :return: Path of the saved file
+        """
+        status, etag = await self._get_file(relative_url, file_name, directory_to_save)
+        if status != 200:
+            raise HTTPError('%s download failed: %s' % (relative_url, status))
+        return os.path.join(directory_to_save, file_name)
+
+    async def _get_file(self, relative_url, file_name, directory_to_save, etag=None):
+        """Download a file and return the status and ETag of the response
+           With etag the file is only downloaded if it no longer matches (304 otherwise)
+        """
+        headers = self.rest_api_headers
+        if etag:
+            headers = dict(headers, **{'If-None-Match': etag})
+        path = os.path.join(directory_to_save, file_name)
+        response_headers = {}
+        # The part file is only opened once the body arrives, inside the Site's
+        # concurrency limit, so queued downloads don't each hold a file open
+        opened = []
+
+        def write(chunk):
+            if not opened:
+                opened.append(_part_file(directory_to_save, file_name))
+            opened[0][0].write(chunk)
+
+        try:
+            try:
+                status, body = await self._site._request(
+                    'GET', "%sGetFileByServerRelativeUrl('%s')/$value" % (self._url('RestWeb'), relative_url),
+                    headers=headers,
+                    on_chunk=write,
+                    response_headers=response_headers)
+                if status == 200 and not opened:
+                    # An empty file
+                    opened.append(_part_file(directory_to_save, file_name))
+            finally:
+                if opened:
+                    opened[0][0].close()
+            if status == 200:
+                os.replace(opened[0][1], path)
+        except BaseException:
+            if opened:
+                os.remove(opened[0][1])
+            raise
+        return status, response_headers.get('ETag', '')
+
+    async def UploadFile(self, file, file_name=None, folder_name=None, overwrite=True, chunk_size=10 * 1024 * 1024,
+                         progress=None):
+        """
+        Uploads a file, in chunks when it is larger than chunk_size
+        See _Documents.UploadFile
+        :return: Share Point File relative url
+        """
+        if not hasattr(file, 'read'):
+            with open(file, 'rb') as f:
+                return await self.UploadFile(f, file_name or os.path.basename(file), folder_name, overwrite,
+                                             chunk_size, progress)
+        if file_name is None: file_name = os.path.basename(file.name)
+        if folder_name is None: folder_name = self.folder
+
+        chunks = _read_chunks(file, chunk_size)
+        chunk, last = next(chunks)
+        status, body = await self._post(self._add_file_url(folder_name, file_name, overwrite),
+                                        chunk if last else b'')
+        if status != 200:
+            raise HTTPError('Uploading %s failed: %s' % (file_name, status))
+        relative_url = self._parse_added_file(etree.fromstring(body, parser=etree.XMLParser(huge_tree=self.huge_tree)))
+        if last:
+            if progress is not None:
+                progress(file_name, len(chunk))
+            return relative_url
+
+        upload_id = str(uuid.uuid4())
+        offset = 0
+        step = 'StartUpload'
+        while True:
+            status, body = await self._post(self._upload_url(relative_url, step, upload_id, offset), chunk)
+            if status != 200:
+                await self._post(self._upload_url(relative_url, 'CancelUpload', upload_id), b'')
+                raise HTTPError('Uploading %s failed: %s' % (file_name, status))
+            offset += len(chunk)
+            if progress is not None:
+                progress(file_name, offset)
+            if last:
+                return relative_url
+            chunk, last = next(chunks)
+            step = 'FinishUpload' if last else 'ContinueUpload'
+
+    async def UploadFiles(self, files, folder_name=None, overwrite=True, chunk_size=10 * 1024 * 1024, progress=None):
+        """
+        Uploads several local files concurrently
+        :return: List of Share Point File relative urls in the order of files
+        """
+        return await asyncio.gather(*[self.UploadFile(file, folder_name=folder_name, overwrite=overwrite,
+                                                      chunk_size=chunk_size, progress=progress) for file in files])
+
+    async def GetAllFilesInFolder(self, directory_to_save, include_sub_folders=False):
+        """
+        Downloads all of the files in the folder concurrently
+        :param directory_to_save: Local directory to save the files to
+        :param include_sub_folders: Also download every sub folder, keeping the folder structure
+        :return: directory_to_save
+        """
+        downloads = []
+        if include_sub_folders:
+            async for folder in self.Walk():
+                final_save_location = _local_path(directory_to_save, folder['path'])
+                for file in folder['files']:
+                    downloads.append(asyncio.ensure_future(
+                        self.GetFileByRelativeUrl(file['url'], file['fileName'], final_save_location)))
+        else:
+            for file in await self.GetDocumentFolderFileNames():
+                downloads.append(self.GetFileByRelativeUrl(file['url'], file['fileName'], directory_to_save))
+        await asyncio.gather(*downloads)
+        return directory_to_save
+
+    async def Sync(self, directory_to_save, include_sub_folders=True, manifest=None):
+        """
+        Brings a local copy of the folder up to date, downloading files concurrently
+        See Documents.Sync
+        :return: Dict of the relative urls downloaded, unchanged, deleted and failed
+        """
+        sync = _Sync(directory_to_save, manifest)
+        downloads = []
+
+        def add(folder):
+            for file in folder['files']:
+                download = sync.check(folder, file)
+                if download is None:
+                    continue
+                url, entry, old_entry, etag = download
+                task = asyncio.ensure_future(self._get_file(url, file['fileName'],
+                                                            _local_path(directory_to_save, folder['path']), etag))
+                downloads.append((url, entry, old_entry, task))
+
+        try:
+            if include_sub_folders:
+                async for folder in self.Walk():
+                    add(folder)
+            else:
+                add(dict(await self._list_folder(self.folder), path=''))
+            for url, entry, old_entry, task in downloads:
+                status, etag = await task
+                sync.downloaded(url, entry, old_entry, status, etag)
+        except BaseException:
+            for url, entry, old_entry, task in downloads:
+                task.cancel()
+            raise
+        return sync.finish()
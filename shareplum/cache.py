@@ -0,0 +1,86 @@
+# Schema cache
+# Keeps the fields, settings and views of Lists
+# and the users of Sites in a SQLite file so short
+# running jobs don't have to download them every time
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+
+
+class SchemaCache(object):
+    """SQLite backed cache for List schemas and Site users
+
+       cache = SchemaCache('shareplum.cache', ttl=3600)
+       site = Site(url, auth=auth, schema_cache=cache)
+
+       A cached List schema younger than ttl seconds is used as is.
+       An older one is only used after checking that the List's
+       Version hasn't changed.  Users are kept for ttl seconds.
+    """
+
+    def __init__(self, path, ttl=86400):
+        self.path = path
+        self.ttl = ttl
+        with self._connect() as db:
+            db.execute('CREATE TABLE IF NOT EXISTS lists '
+                       '(site_url TEXT, list_name TEXT, version TEXT, saved REAL, data TEXT, '
+                       'PRIMARY KEY (site_url, list_name))')
+            db.execute('CREATE TABLE IF NOT EXISTS users '
+                       '(site_url TEXT PRIMARY KEY, saved REAL, data TEXT)')
+
+    @contextmanager
+    def _connect(self):
+        # A connection per call keeps the cache safe to share between threads
+        db = sqlite3.connect(self.path, timeout=30)
+        try:
+            with db:
+                yield db
+        finally:
+            db.close()
+
+    def _fresh(self, saved):
+        return time.time() - saved < self.ttl
+
+    def get_list(self, site_url, list_name):
+        """Returns (version, fresh, data) for a cached List or None"""
+        with self._connect() as db:
+            row = db.execute('SELECT version, saved, data FROM lists WHERE site_url = ? AND list_name = ?',
+                             (site_url, list_name)).fetchone()
+        if row is None:
+            return None
+        version, saved, data = row
+        return version, self._fresh(saved), json.loads(data)
+
+    def set_list(self, site_url, list_name, version, data):
+        """Save the schema of a List"""
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO lists VALUES (?, ?, ?, ?, ?)',
+                       (site_url, list_name, version, time.time(), json.dumps(data)))
+
+    def touch_list(self, site_url, list_name):
+        """Mark a cached List as checked just now"""
+        with self._connect() as db:
+            db.execute('UPDATE lists SET saved = ? WHERE site_url = ? AND list_name = ?',
+                       (time.time(), site_url, list_name))
+
+    def get_users(self, site_url):
+        """Returns the cached user maps of a Site if they are fresh"""
+        with self._connect() as db:
+            row = db.execute('SELECT saved, data FROM users WHERE site_url = ?', (site_url,)).fetchone()
+        if row is None or not self._fresh(row[0]):
+            return None
+        return json.loads(row[1])
+
+    def set_users(self, site_url, users):
+        """Save the user maps of a Site"""
+        with self._connect() as db:
+            db.execute('INSERT OR REPLACE INTO users VALUES (?, ?, ?)',
+                       (site_url, time.time(), json.dumps({'py': dict(users['py']), 'sp': dict(users['sp'])})))
+
+    def clear(self):
+        """Forget everything"""
+        with self._connect() as db:
+            db.execute('DELETE FROM lists')
+            db.execute('DELETE FROM users')
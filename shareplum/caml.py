@@ -0,0 +1,326 @@
+# CAML query builder
+# Builds the Where element of GetListItems from python
+# comparisons, so rows are filtered on the server and only
+# the columns that are needed are sent back.
+#
+#   from shareplum.caml import Field, Query
+#   query = Query(where=(Field('Status').In(['Open', 'Pending']) & (Field('Modified') > last_sync))
+#                       | (Field('Project', lookup_id=True) == 12),
+#                 select=['Title', 'Status', 'Modified'])
+#   sp_list.GetListItems(query=query)
+
+from __future__ import unicode_literals
+from datetime import datetime
+
+from lxml import etree
+
+# Most values SharePoint takes in one In element
+IN_LIMIT = 500
+
+_NO_VALUE = object()
+
+
+def _text(value):
+    return value if isinstance(value, type('')) else '%s' % (value,)
+
+
+def _condition(condition):
+    """Conditions can also be given as ('Eq', 'Column', 'value') tuples"""
+    if isinstance(condition, tuple):
+        return Compare(condition[0], Field(condition[1]), *condition[2:])
+    return condition
+
+
+class Condition(object):
+    """Part of a Where, combine them with & and |
+
+       Subclasses provide fields(), the display names of the columns
+       they use, and element(sp_list), their CAML element with column
+       names and values converted for sp_list, or as given when it is None.
+    """
+
+    def __and__(self, other):
+        return And(self, other)
+
+    def __or__(self, other):
+        return Or(self, other)
+
+    def __rand__(self, other):
+        return And(other, self)
+
+    def __ror__(self, other):
+        return Or(other, self)
+
+    def __repr__(self):
+        return '<%s %s>' % (self.__class__.__name__, etree.tostring(self.element(None)).decode('utf-8'))
+
+
+class _Group(Condition):
+    """And or Or of any number of conditions, nested in pairs for CAML"""
+    tag = None
+
+    def __init__(self, *conditions):
+        self.conditions = []
+        for condition in conditions:
+            condition = _condition(condition)
+            # (a & b) & c is one And of three
+            if type(condition) is type(self):
+                self.conditions.extend(condition.conditions)
+            else:
+                self.conditions.append(condition)
+        if not self.conditions:
+            raise ValueError('%s needs at least one condition' % self.tag)
+
+    def fields(self):
+        names = set()
+        for condition in self.conditions:
+            names.update(condition.fields())
+        return names
+
+    def element(self, sp_list):
+        elements = [condition.element(sp_list) for condition in self.conditions]
+        # CAML And and Or take exactly two children
+        element = elements.pop()
+        while elements:
+            group = etree.Element(self.tag)
+            group.append(elements.pop())
+            group.append(element)
+            element = group
+        return element
+
+
+class And(_Group):
+    """Every condition matches"""
+    tag = 'And'
+
+
+class Or(_Group):
+    """Any condition matches"""
+    tag = 'Or'
+
+
+class Compare(Condition):
+    """Eq, Neq, Lt, Leq, Gt, Geq, IsNull, IsNotNull, Contains, BeginsWith..."""
+
+    def __init__(self, operator, field, value=_NO_VALUE):
+        self.operator = operator
+        self.field = field
+        self.value = value
+
+    def fields(self):
+        return {self.field.name}
+
+    def element(self, sp_list):
+        element = etree.Element(self.operator)
+        element.append(self.field.field_ref(sp_list))
+        if self.value is not _NO_VALUE:
+            element.append(self.field.value(sp_list, self.value))
+        return element
+
+
+class In(Condition):
+    """The column is one of values
+       Long lists are split into an Or of In elements.
+    """
+
+    def __init__(self, field, values):
+        self.field = field
+        self.values = list(values)
+        if not self.values:
+            raise ValueError('In needs at least one value')
+
+    def fields(self):
+        return {self.field.name}
+
+    def element(self, sp_list):
+        groups = []
+        for start in range(0, len(self.values), IN_LIMIT):
+            element = etree.Element('In')
+            element.append(self.field.field_ref(sp_list))
+            values = etree.SubElement(element, 'Values')
+            for value in self.values[start:start + IN_LIMIT]:
+                values.append(self.field.value(sp_list, value))
+            groups.append(element)
+        if len(groups) == 1:
+            return groups[0]
+        return Or(*[_Element(group) for group in groups]).element(sp_list)
+
+
+class _Element(Condition):
+    """An element that is already built"""
+
+    def __init__(self, element):
+        self._element = element
+
+    def fields(self):
+        return set()
+
+    def element(self, sp_list):
+        return self._element
+
+
+class Tokens(Condition):
+    """The list form of a Where that GetListItems has always taken
+       ['And', ('Eq', 'Status', 'Open'), ('Gt', 'Amount', 10)]
+    """
+
+    def __init__(self, tokens):
+        self.tokens = list(tokens)
+
+    def fields(self):
+        return {token[1] for token in self.tokens if isinstance(token, tuple)}
+
+    def element(self, sp_list):
+        where = etree.Element('Where')
+        parents = [where]
+        for token in self.tokens:
+            if token == 'And':
+                parents.append(etree.SubElement(parents[-1], 'And'))
+            elif token == 'Or':
+                if parents[-1].tag == 'Or':
+                    parents.pop()
+                parents.append(etree.SubElement(parents[-1], 'Or'))
+            else:
+                field = Field(token[1])
+                _type = etree.SubElement(parents[-1], token[0])
+                _type.append(field.field_ref(sp_list))
+                if len(token) == 3:
+                    value = etree.SubElement(_type, 'Value')
+                    value.set('Type', field._column(sp_list)['type'])
+                    value.text = token[2] if sp_list is None else sp_list._sp_type(token[1], token[2])
+        children = list(where)
+        if len(children) == 1:
+            return children[0]
+        return And(*[_Element(child) for child in children]).element(sp_list)
+
+
+class Field(object):
+    """A List column by its display name
+
+       Field('Modified') > datetime(2020, 1, 1)
+       Field('Status').In(['Open', 'Pending'])
+       Field('Project', lookup_id=True) == 12
+
+       lookup_id compares Lookup and User columns by the ID of
+       the item they point to instead of its text.
+    """
+
+    def __init__(self, name, lookup_id=False):
+        self.name = name
+        self.lookup_id = lookup_id
+
+    def __eq__(self, value):
+        return Compare('Eq', self, value)
+
+    def __ne__(self, value):
+        return Compare('Neq', self, value)
+
+    def __lt__(self, value):
+        return Compare('Lt', self, value)
+
+    def __le__(self, value):
+        return Compare('Leq', self, value)
+
+    def __gt__(self, value):
+        return Compare('Gt', self, value)
+
+    def __ge__(self, value):
+        return Compare('Geq', self, value)
+
+    __hash__ = object.__hash__
+
+    def In(self, values):
+        return In(self, values)
+
+    def IsNull(self):
+        return Compare('IsNull', self)
+
+    def IsNotNull(self):
+        return Compare('IsNotNull', self)
+
+    def Contains(self, text):
+        return Compare('Contains', self, text)
+
+    def BeginsWith(self, text):
+        return Compare('BeginsWith', self, text)
+
+    def _column(self, sp_list):
+        if sp_list is None:
+            return {'name': self.name, 'type': 'Text'}
+        try:
+            return sp_list._disp_cols[self.name]
+        except KeyError:
+            raise Exception(self.name + ' not a column in current List.')
+
+    def field_ref(self, sp_list):
+        field_ref = etree.Element('FieldRef')
+        field_ref.set('Name', self._column(sp_list)['name'])
+        if self.lookup_id:
+            field_ref.set('LookupId', 'TRUE')
+        return field_ref
+
+    def value(self, sp_list, value):
+        element = etree.Element('Value')
+        if self.lookup_id:
+            element.set('Type', 'Integer')
+            element.text = _text(int(value))
+            return element
+        element.set('Type', self._column(sp_list)['type'])
+        if isinstance(value, datetime):
+            # Compare the time too, not only the date
+            element.set('IncludeTimeValue', 'TRUE')
+        if sp_list is not None:
+            value = sp_list._sp_type(self.name, value)
+        element.text = _text(value)
+        return element
+
+
+class Query(object):
+    """A GetListItems query
+
+       where     Condition the rows must match
+       select    Columns to return, the fewer the smaller the response
+       order_by  Columns to sort by, ('Column', 'DESCENDING') to reverse
+       group_by  Columns to group by
+
+       sp_list.GetListItems(query=Query(where=Field('Done') == 'No', select=['Title']))
+    """
+
+    def __init__(self, where=None, select=None, order_by=None, group_by=None):
+        self.where = _condition(where)
+        self.select = list(select) if select is not None else None
+        self.order_by = list(order_by) if order_by is not None else None
+        self.group_by = list(group_by) if group_by is not None else None
+
+    def fields(self):
+        """Display names of every column the query uses"""
+        names = set(self.select or [])
+        if self.where is not None:
+            names.update(self.where.fields())
+        for field in (self.order_by or []) + (self.group_by or []):
+            names.add(field[0] if isinstance(field, tuple) else field)
+        return names
+
+    def as_dict(self):
+        """The query in the dict form GetListItems has always taken"""
+        query = {}
+        if self.where is not None:
+            query['Where'] = self.where
+        if self.order_by is not None:
+            query['OrderBy'] = self.order_by
+        if self.group_by is not None:
+            query['GroupBy'] = self.group_by
+        return query
+
+
+def within_ids(where, low, high):
+    """where limited to the IDs from low to high
+       where can be a Condition or the list form of a Where,
+       it is nested as one subtree so every And has two children
+    """
+    ids = (Field('ID') >= low) & (Field('ID') <= high)
+    if not where:
+        return ids
+    if not isinstance(where, Condition):
+        where = Tokens(where)
+    return ids & where
@@ -0,0 +1,237 @@
+# Column oriented results for GetListItems(as_columns=True)
+# Each column keeps its values in one typed array instead of
+# every row repeating the column names in a dict.
+# numpy, pandas and pyarrow are only needed for the exports.
+
+from array import array
+from datetime import datetime, timedelta
+
+# Typecode of 64 bit integers.  Python 2 has no 'q', its 'l' is 64 bit
+# on 64 bit Linux and macOS but not on Windows, where DateTime columns
+# need Python 3.
+try:
+    array('q')
+    _INT64 = 'q'
+except ValueError:
+    _INT64 = 'l'
+
+# numpy's NaT, used for missing dates
+_NULL_TIME = -2 ** 63
+_EPOCH = datetime(1970, 1, 1)
+
+
+class _Column(object):
+    """Python objects, None when empty"""
+    kind = 'object'
+
+    def __init__(self, name, convert):
+        self.name = name
+        self._convert = convert
+        self.values = []
+
+    def append(self, value):
+        self.values.append(None if value is None else self._convert(value))
+
+    def extend(self, other):
+        self.values.extend(other.values)
+
+    def to_list(self):
+        return list(self.values)
+
+    def to_numpy(self, np):
+        return np.array(self.values, dtype=object)
+
+    def to_pandas(self, np, pd):
+        return self.to_numpy(np)
+
+    def to_arrow(self, np, pa):
+        return pa.array(self.values)
+
+
+class _FloatColumn(_Column):
+    """Number and Currency as float64, NaN when empty"""
+    kind = 'float'
+
+    def __init__(self, name, convert):
+        _Column.__init__(self, name, convert)
+        self.values = array('d')
+
+    def append(self, value):
+        self.values.append(float('nan') if value is None else self._convert(value))
+
+    def to_numpy(self, np):
+        return np.frombuffer(self.values, dtype='float64') if self.values else np.array([], dtype='float64')
+
+    def to_arrow(self, np, pa):
+        return pa.array(self.to_numpy(np), from_pandas=True)
+
+
+class _DateTimeColumn(_Column):
+    """DateTime as microseconds since 1970, like datetime64[us]"""
+    kind = 'datetime'
+
+    def __init__(self, name, convert):
+        _Column.__init__(self, name, convert)
+        self.values = array(_INT64)
+
+    def append(self, value):
+        value = None if value is None else self._convert(value)
+        if isinstance(value, datetime):
+            delta = value - _EPOCH
+            self.values.append((delta.days * 86400 + delta.seconds) * 1000000 + delta.microseconds)
+        else:
+            self.values.append(_NULL_TIME)
+
+    def to_list(self):
+        return [None if value == _NULL_TIME else _EPOCH + timedelta(microseconds=value) for value in self.values]
+
+    def to_numpy(self, np):
+        if not self.values:
+            return np.array([], dtype='datetime64[us]')
+        return np.frombuffer(self.values, dtype='int64').view('datetime64[us]')
+
+    def to_arrow(self, np, pa):
+        values = np.frombuffer(self.values, dtype='int64') if self.values else np.array([], dtype='int64')
+        return pa.array(values, type=pa.timestamp('us'), mask=values == _NULL_TIME)
+
+
+class _DictionaryColumn(_Column):
+    """Choice, User and Boolean as int32 codes into a list of categories"""
+    kind = 'dictionary'
+
+    def __init__(self, name, convert):
+        _Column.__init__(self, name, convert)
+        self.values = array('i')
+        self.categories = []
+        self._codes = {}
+
+    def append(self, value):
+        if value is None:
+            self.values.append(-1)
+            return
+        value = self._convert(value)
+        code = self._codes.get(value)
+        if code is None:
+            code = self._codes[value] = len(self.categories)
+            self.categories.append(value)
+        self.values.append(code)
+
+    def extend(self, other):
+        # Codes of the other column point into its own categories
+        remap = array('i', [0] * len(other.categories))
+        for code, value in enumerate(other.categories):
+            if value not in self._codes:
+                self._codes[value] = len(self.categories)
+                self.categories.append(value)
+            remap[code] = self._codes[value]
+        self.values.extend(array('i', [-1 if code < 0 else remap[code] for code in other.values]))
+
+    def to_list(self):
+        return [None if code < 0 else self.categories[code] for code in self.values]
+
+    def _codes_array(self, np):
+        return np.frombuffer(self.values, dtype='int32') if self.values else np.array([], dtype='int32')
+
+    def to_numpy(self, np):
+        return np.array(self.to_list(), dtype=object)
+
+    def to_pandas(self, np, pd):
+        return pd.Categorical.from_codes(self._codes_array(np), self.categories)
+
+    def to_arrow(self, np, pa):
+        codes = self._codes_array(np)
+        return pa.DictionaryArray.from_arrays(pa.array(codes, mask=codes < 0), pa.array(self.categories))
+
+
+_KINDS = {'object': _Column, 'float': _FloatColumn, 'datetime': _DateTimeColumn, 'dictionary': _DictionaryColumn}
+
+
+class ListColumns(object):
+    """Column oriented GetListItems result
+
+       data = sp_list.GetListItems(fields=['Title', 'Amount'], as_columns=True)
+       data['Amount']      # list of the column's values
+       data.to_pandas()    # DataFrame
+       data.to_arrow()     # pyarrow Table
+       data.to_parquet('list.parquet')
+
+       Number and Currency columns are float64 arrays, DateTime
+       columns int64 microseconds (datetime64[us]) and Choice, User
+       and Boolean columns int32 codes into a list of categories.
+    """
+
+    def __init__(self, specs):
+        """specs: (row attribute, column name, kind, converter) for each column"""
+        self.columns = []
+        self._keys = []
+        for key, name, kind, convert in specs:
+            self.columns.append(_KINDS[kind](name, convert))
+            self._keys.append(key)
+        self._length = 0
+
+    def append(self, row):
+        """Add a row from anything with .get(), like a z:row element"""
+        get = row.get
+        for key, column in zip(self._keys, self.columns):
+            column.append(get(key))
+        self._length += 1
+
+    def extend(self, other):
+        """Add the rows of another ListColumns with the same columns"""
+        for column, other_column in zip(self.columns, other.columns):
+            column.extend(other_column)
+        self._length += len(other)
+
+    def __len__(self):
+        return self._length
+
+    def __iter__(self):
+        return iter(self.names)
+
+    def __getitem__(self, name):
+        for column in self.columns:
+            if column.name == name:
+                return column.to_list()
+        raise KeyError(name)
+
+    @property
+    def names(self):
+        return [column.name for column in self.columns]
+
+    def to_dict(self):
+        """{column name: list of values}"""
+        return {column.name: column.to_list() for column in self.columns}
+
+    def truncate(self, length):
+        """Keep only the first length rows"""
+        for column in self.columns:
+            del column.values[length:]
+        self._length = min(self._length, length)
+
+    def to_rows(self):
+        """One dict per row like GetListItems, with None (NaN for numbers) for empty values"""
+        names = self.names
+        return [dict(zip(names, values)) for values in zip(*[column.to_list() for column in self.columns])]
+
+    def to_numpy(self):
+        """{column name: numpy array}, numeric and date columns aren't copied"""
+        import numpy as np
+        return {column.name: column.to_numpy(np) for column in self.columns}
+
+    def to_pandas(self):
+        """pandas DataFrame, dictionary columns become Categoricals"""
+        import numpy as np
+        import pandas as pd
+        return pd.DataFrame({column.name: column.to_pandas(np, pd) for column in self.columns},
+                            columns=self.names)
+
+    def to_arrow(self):
+        """pyarrow Table"""
+        import numpy as np
+        import pyarrow as pa
+        return pa.Table.from_arrays([column.to_arrow(np, pa) for column in self.columns], names=self.names)
+
+    def to_parquet(self, path, **kwargs):
+        """Write a Parquet file with pyarrow"""
+        import pyarrow.parquet as pq
+        pq.write_table(self.to_arrow(), path, **kwargs)
@@ -0,0 +1,324 @@
+# Export orchestrator
+# Runs many List exports at once across Sites, with a limit
+# on the exports running in total and against each host.
+# One Site is shared by every job on the same site url and a
+# checkpoint file lets a crashed run pick up where it stopped.
+#
+#   exporter = Exporter(JsonLinesSink('exports'), site_options={'auth': auth},
+#                       schema_cache=SchemaCache('shareplum.cache'), checkpoint='exports/checkpoint.json')
+#   results = exporter.run([(url, 'Orders'), (url, 'Customers', query), (other_url, 'Tasks')])
+
+import hashlib
+import io
+import json
+import logging
+import os
+import re
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from datetime import datetime
+
+try:
+    from urllib.parse import urlparse
+except ImportError:
+    from urlparse import urlparse
+
+from .caml import Query
+from .shareplum import Site, _part_file, _replace
+
+log = logging.getLogger('shareplum.export')
+
+
+class ExportJob(object):
+    """One List to export
+
+       site_url   Site the List is on
+       list_name  Display name of the List
+       query      Query dict or caml.Query, None for every row
+       fields     Columns to export, defaults to every column or the query's select
+       viewname   View to export instead of fields
+       name       Name of the output and checkpoint entry, made from the url, List
+                  and a hash of the query, fields and viewname by default
+    """
+
+    def __init__(self, site_url, list_name, query=None, fields=None, viewname=None, name=None):
+        self.site_url = site_url
+        self.list_name = list_name
+        self.query = query
+        self.fields = fields
+        self.viewname = viewname
+        self.name = name or _job_name(site_url, list_name, query, fields, viewname)
+
+    @property
+    def host(self):
+        return urlparse(self.site_url).netloc.lower()
+
+    def __repr__(self):
+        return '<ExportJob %s>' % self.name
+
+
+def _job_name(site_url, list_name, query=None, fields=None, viewname=None):
+    """A file name made from the site url and List name
+       Jobs with a query, fields or viewname get a hash of them
+       added, so different exports of one List don't share a name.
+    """
+    url = urlparse(site_url)
+    parts = [url.netloc] + [part for part in url.path.split('/') if part] + [list_name]
+    if query is not None or fields is not None or viewname is not None:
+        if isinstance(query, Query):
+            query = dict(query.as_dict(), select=query.select)
+        # Conditions are written as their CAML, so the hash is the same on every run
+        selection = json.dumps([query, fields, viewname], default=_json_default, sort_keys=True)
+        parts.append(hashlib.sha1(selection.encode('utf-8')).hexdigest()[:8])
+    return re.sub(r'[^\w.-]+', '_', '_'.join(parts))
+
+
+def _job(job):
+    """Jobs can also be given as (site_url, list_name[, query]) tuples"""
+    if isinstance(job, ExportJob):
+        return job
+    return ExportJob(*job)
+
+
+def _json_default(value):
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return '%s' % (value,)
+
+
+class _FileSink(object):
+    """Writes each job to directory/<job name><extension>
+       Output goes to a part file that only replaces the real one
+       once the whole List is written.
+
+       Subclasses set extension and provide _write(output, columns, data),
+       which writes data to the binary file output and returns the row count.
+    """
+    extension = ''
+    # Columnar sinks get a ListColumns instead of rows
+    columnar = False
+
+    def __init__(self, directory):
+        self.directory = directory
+
+    def path(self, job):
+        return os.path.join(self.directory, job.name + self.extension)
+
+    def write(self, job, columns, data):
+        """Write the rows, or ListColumns, of job and return how many there were
+           columns are the display names of the exported columns
+        """
+        output, part = _part_file(self.directory, job.name + self.extension)
+        try:
+            with output:
+                count = self._write(output, columns, data)
+            _replace(part, self.path(job))
+        except BaseException:
+            os.remove(part)
+            raise
+        return count
+
+
+class JsonLinesSink(_FileSink):
+    """One JSON object per row, dates in ISO format"""
+    extension = '.jsonl'
+
+    def _write(self, output, columns, rows):
+        count = 0
+        for row in rows:
+            output.write((json.dumps(row, default=_json_default, ensure_ascii=False) + '\n').encode('utf-8'))
+            count += 1
+        return count
+
+
+class CsvSink(_FileSink):
+    """CSV with a header of the column names, Python 3 only"""
+    extension = '.csv'
+
+    def __init__(self, directory, **fmtparams):
+        _FileSink.__init__(self, directory)
+        self.fmtparams = fmtparams
+
+    def _write(self, output, columns, rows):
+        import csv
+        text = io.TextIOWrapper(output, encoding='utf-8', newline='')
+        writer = csv.DictWriter(text, columns, extrasaction='ignore', **self.fmtparams)
+        writer.writeheader()
+        count = 0
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        text.flush()
+        text.detach()
+        return count
+
+
+class ParquetSink(_FileSink):
+    """Parquet files written with pyarrow, see ListColumns.to_parquet"""
+    extension = '.parquet'
+    columnar = True
+
+    def __init__(self, directory, **kwargs):
+        _FileSink.__init__(self, directory)
+        self.kwargs = kwargs
+
+    def _write(self, output, columns, data):
+        import pyarrow.parquet as pq
+        pq.write_table(data.to_arrow(), output, **self.kwargs)
+        return len(data)
+
+
+class Checkpoint(object):
+    """Jobs already exported, kept in a JSON file"""
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        try:
+            with open(path, 'rb') as f:
+                self.jobs = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            self.jobs = {}
+
+    def __contains__(self, job):
+        return job.name in self.jobs
+
+    def add(self, job, result):
+        """Record a finished job, the file is replaced so a crash can't leave half of it"""
+        with self._lock:
+            self.jobs[job.name] = result
+            output, part = _part_file(os.path.dirname(self.path) or '.', os.path.basename(self.path))
+            with output:
+                output.write(json.dumps(self.jobs, indent=1, sort_keys=True).encode('utf-8'))
+            _replace(part, self.path)
+
+
+class Exporter(object):
+    """Export many Lists at the same time
+
+       sink          JsonLinesSink, CsvSink, ParquetSink or anything with their write method
+       workers       Exports running at the same time
+       per_host      Exports running at the same time against one host
+       site_options  Arguments for every Site, like auth or authcookie
+       site_factory  Called with a site url to make its Site instead
+       schema_cache  SchemaCache shared by every Site
+       checkpoint    JSON file of the finished jobs, they are skipped when run again
+       page_size     Rows per request
+       progress      Called as progress(job, result) after each job
+
+       Jobs on the same site url share one Site, so its connections,
+       login, users and List schemas are only set up once.
+    """
+
+    def __init__(self, sink, workers=8, per_host=4, site_options=None, site_factory=None, schema_cache=None,
+                 checkpoint=None, page_size=5000, progress=None):
+        self.sink = sink
+        self.workers = workers
+        self.per_host = max(per_host, 1)
+        self.site_options = dict(site_options or {})
+        self.site_factory = site_factory
+        self.schema_cache = schema_cache
+        self.checkpoint = Checkpoint(checkpoint) if checkpoint else None
+        self.page_size = page_size
+        self.progress = progress
+        self._sites = {}
+        self._lists = {}
+        self._lock = threading.Lock()
+
+    def site(self, site_url):
+        """The shared Site of site_url"""
+        with self._lock:
+            if site_url not in self._sites:
+                if self.site_factory is not None:
+                    self._sites[site_url] = self.site_factory(site_url)
+                else:
+                    options = dict({'pool_maxsize': self.per_host, 'schema_cache': self.schema_cache},
+                                   **self.site_options)
+                    self._sites[site_url] = Site(site_url, **options)
+            return self._sites[site_url]
+
+    def _list(self, job):
+        key = (job.site_url, job.list_name)
+        with self._lock:
+            sp_list = self._lists.get(key)
+        if sp_list is None:
+            # Outside the lock, loading the schema is a request
+            sp_list = self.site(job.site_url).List(job.list_name)
+            with self._lock:
+                sp_list = self._lists.setdefault(key, sp_list)
+        return sp_list
+
+    def run(self, jobs):
+        """Run every job not already in the checkpoint
+           Returns {job name: result}, a result is {'rows', 'seconds', 'path'}
+           or {'error'} for a job that failed.  Failed jobs don't stop the others
+           and aren't checkpointed, so they are tried again next time.
+           Raises ValueError if two jobs have the same name.
+        """
+        queue = deque()
+        results = {}
+        names = set()
+        for job in jobs:
+            job = _job(job)
+            if job.name in names:
+                raise ValueError('Two export jobs are named %s' % job.name)
+            names.add(job.name)
+            if self.checkpoint is not None and job in self.checkpoint:
+                results[job.name] = dict(self.checkpoint.jobs[job.name], skipped=True)
+            else:
+                queue.append(job)
+
+        running = {}
+        hosts = {}
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            while queue or running:
+                # Start the first queued jobs whose hosts have room
+                waiting = deque()
+                while queue and len(running) < self.workers:
+                    job = queue.popleft()
+                    if hosts.get(job.host, 0) >= self.per_host:
+                        waiting.append(job)
+                        continue
+                    hosts[job.host] = hosts.get(job.host, 0) + 1
+                    running[executor.submit(self._export, job)] = job
+                waiting.extend(queue)
+                queue = waiting
+
+                done, not_done = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    job = running.pop(future)
+                    hosts[job.host] -= 1
+                    results[job.name] = self._finish(job, future)
+        return results
+
+    def _finish(self, job, future):
+        try:
+            result = future.result()
+        except Exception as e:
+            log.exception('Export of %s failed', job.name)
+            result = {'error': '%s' % (e,)}
+        else:
+            log.info('Exported %d rows of %s in %.1fs', result['rows'], job.name, result['seconds'])
+            if self.checkpoint is not None:
+                self.checkpoint.add(job, result)
+        if self.progress is not None:
+            self.progress(job, result)
+        return result
+
+    def _export(self, job):
+        start = time.time()
+        sp_list = self._list(job)
+        # Display names of the columns, for the CSV header
+        viewfields = sp_list._build_list_items_request(job.viewname, job.fields, job.query)[1]
+        names = sp_list._row_converter(viewfields)[0]
+        columns = [names['ows_' + key] for key in viewfields]
+
+        if getattr(self.sink, 'columnar', False):
+            data = sp_list._get_columns(job.viewname, job.fields, job.query, self.page_size)
+        else:
+            data = sp_list.IterListItems(job.viewname, job.fields, job.query, page_size=self.page_size)
+        rows = self.sink.write(job, columns, data)
+        path = self.sink.path(job) if hasattr(self.sink, 'path') else None
+        return {'rows': rows, 'seconds': time.time() - start, 'path': path, 'finished': datetime.now().isoformat()}
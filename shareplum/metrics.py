@@ -0,0 +1,184 @@
+# Request metrics
+# Hooks added with Site.AddMetricsHook are called once for every
+# request with a RequestMetrics telling where the time went:
+# waiting on the server, parsing the XML or converting the rows.
+# Nothing is measured while a Site has no hooks.
+
+import logging
+import re
+from timeit import default_timer
+
+log = logging.getLogger('shareplum.metrics')
+
+
+class RequestMetrics(object):
+    """What one request cost
+
+       action          SOAP action, or the REST path after /_api/
+       method          HTTP method
+       url             Request url
+       status          HTTP status of the last attempt
+       bytes_sent      Request body size
+       bytes_received  Response body size, as read from the socket
+       server_time     Seconds until the response headers arrived
+       total_time      Seconds spent in the session, including throttling waits
+       parse_time      Seconds spent in lxml, for streamed responses this
+                       includes reading the body from the socket
+       convert_time    Seconds spent converting rows to python values
+       rows            Rows returned, None when the call doesn't return rows
+       retries         Throttled attempts that were tried again
+    """
+
+    __slots__ = ('action', 'method', 'url', 'status', 'bytes_sent', 'bytes_received', 'server_time',
+                 'total_time', 'parse_time', 'convert_time', 'rows', 'retries', '_hooks')
+
+    fields = __slots__[:-1]
+
+    def __init__(self, hooks, action, method, url):
+        self._hooks = hooks
+        self.action = action
+        self.method = method
+        self.url = url
+        self.status = None
+        self.bytes_sent = 0
+        self.bytes_received = None
+        self.server_time = 0.0
+        self.total_time = 0.0
+        self.parse_time = 0.0
+        self.convert_time = 0.0
+        self.rows = None
+        self.retries = 0
+
+    def emit(self):
+        """Pass the metrics to every hook, only the first call does anything"""
+        hooks, self._hooks = self._hooks, None
+        for hook in hooks or ():
+            try:
+                hook(self)
+            except Exception:
+                # A broken hook mustn't break the request
+                log.exception('Metrics hook %r failed', hook)
+
+    def as_dict(self):
+        return {name: getattr(self, name) for name in self.fields}
+
+    def __repr__(self):
+        return '<RequestMetrics %s %s>' % (self.action, self.status)
+
+
+# Seconds from a monotonic clock where there is one
+timer = default_timer
+
+
+# Arguments of a REST call, like ('Shared Documents') or (url='a.txt',overwrite=true)
+_arguments = re.compile(r"\((?:'[^']*'|[^)'])*\)")
+
+
+def request_action(url, headers):
+    """SOAP action of a request, or its REST path after /_api/ without the arguments
+       so file and folder names don't end up in metric labels
+    """
+    action = headers.get('SOAPAction') if headers else None
+    if action:
+        return action.strip('"').rsplit('/', 1)[-1]
+    path = url.split('?', 1)[0]
+    if '/_api/' in path:
+        path = path.split('/_api/', 1)[1]
+    return _arguments.sub('', path)
+
+
+class LoggingHook(object):
+    """Log a line for every request
+
+       site.AddMetricsHook(LoggingHook())
+       logging.getLogger('shareplum.metrics').setLevel(logging.DEBUG)
+    """
+
+    def __init__(self, logger=None, level=logging.DEBUG):
+        self.logger = logger or log
+        self.level = level
+
+    def __call__(self, metrics):
+        if not self.logger.isEnabledFor(self.level):
+            return
+        self.logger.log(self.level,
+                        '%s %s: %s sent %d bytes, received %s bytes, server %.3fs, parse %.3fs, '
+                        'convert %.3fs, total %.3fs, %s rows, %d retries',
+                        metrics.method, metrics.action, metrics.status, metrics.bytes_sent,
+                        metrics.bytes_received, metrics.server_time, metrics.parse_time,
+                        metrics.convert_time, metrics.total_time, metrics.rows, metrics.retries)
+
+
+class PrometheusHook(object):
+    """Export request metrics with prometheus_client
+
+       site.AddMetricsHook(PrometheusHook())
+
+       Every metric is labelled with the action and the ones
+       counting requests with the status too.
+    """
+
+    def __init__(self, registry=None, prefix='shareplum'):
+        from prometheus_client import Counter, Histogram, REGISTRY
+        registry = REGISTRY if registry is None else registry
+        self.requests = Counter(prefix + '_requests', 'Requests sent', ['action', 'status'], registry=registry)
+        self.retries = Counter(prefix + '_retries', 'Throttled requests tried again', ['action'],
+                               registry=registry)
+        self.bytes_sent = Counter(prefix + '_sent_bytes', 'Request body bytes', ['action'], registry=registry)
+        self.bytes_received = Counter(prefix + '_received_bytes', 'Response body bytes', ['action'],
+                                      registry=registry)
+        self.rows = Counter(prefix + '_rows', 'List rows returned', ['action'], registry=registry)
+        self.times = {}
+        for name in ('server', 'parse', 'convert', 'total'):
+            self.times[name] = Histogram('%s_%s_seconds' % (prefix, name), 'Seconds spent in %s' % name,
+                                         ['action'], registry=registry)
+
+    def __call__(self, metrics):
+        action = metrics.action
+        self.requests.labels(action, str(metrics.status)).inc()
+        if metrics.retries:
+            self.retries.labels(action).inc(metrics.retries)
+        self.bytes_sent.labels(action).inc(metrics.bytes_sent)
+        if metrics.bytes_received:
+            self.bytes_received.labels(action).inc(metrics.bytes_received)
+        if metrics.rows:
+            self.rows.labels(action).inc(metrics.rows)
+        for name, histogram in self.times.items():
+            histogram.labels(action).observe(getattr(metrics, name + '_time'))
+
+
+class OpenTelemetryHook(object):
+    """Record request metrics with the OpenTelemetry metrics API
+
+       site.AddMetricsHook(OpenTelemetryHook())
+
+       Uses the global MeterProvider unless a meter is given.
+    """
+
+    def __init__(self, meter=None, prefix='shareplum'):
+        if meter is None:
+            from opentelemetry import metrics
+            meter = metrics.get_meter('shareplum')
+        self.requests = meter.create_counter(prefix + '.requests', description='Requests sent')
+        self.retries = meter.create_counter(prefix + '.retries', description='Throttled requests tried again')
+        self.bytes_sent = meter.create_counter(prefix + '.sent', unit='By', description='Request body bytes')
+        self.bytes_received = meter.create_counter(prefix + '.received', unit='By',
+                                                   description='Response body bytes')
+        self.rows = meter.create_counter(prefix + '.rows', description='List rows returned')
+        self.times = {}
+        for name in ('server', 'parse', 'convert', 'total'):
+            self.times[name] = meter.create_histogram('%s.%s_time' % (prefix, name), unit='s',
+                                                      description='Seconds spent in %s' % name)
+
+    def __call__(self, metrics):
+        attributes = {'action': metrics.action}
+        self.requests.add(1, dict(attributes, status=metrics.status))
+        if metrics.retries:
+            self.retries.add(metrics.retries, attributes)
+        self.bytes_sent.add(metrics.bytes_sent, attributes)
+        if metrics.bytes_received:
+            self.bytes_received.add(metrics.bytes_received, attributes)
+        if metrics.rows:
+            self.rows.add(metrics.rows, attributes)
+        for name, histogram in self.times.items():
+            histogram.record(getattr(metrics, name + '_time'), attributes)
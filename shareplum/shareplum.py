@@ -3,19 +3,61 @@ from .version import __version__
 from lxml import etree
 import requests
 from datetime import datetime
+import binascii
+import calendar
+import hashlib
+import hmac
 import re
 import os
+import json
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from requests.adapters import HTTPAdapter
 from requests_toolbelt import SSLAdapter
+from urllib3.util.retry import Retry
+from .caml import Condition, Query, Tokens, within_ids
+from .columns import ListColumns
+from .metrics import timer as _timer
+from .throttle import ThrottledSession
 
 
 class Office365(object):
     """
     Class to authenticate Office  365 Sharepoint
+    The cookies are kept until shortly before the login token expires and shared by
+    every Office365 object for the same site, user and password.  With cache_file
+    they are also saved for other processes.  With auto_renew they are renewed in the
+    background before they expire, updating the returned cookie jar in place,
+    until close is called.
     """
-    def __init__(self, share_point_site, username, password):
+    # (share_point_site, username, credentials hash): (cookie jar, expires)
+    _cookies = {}
+    # (share_point_site, username, credentials hash): renewal Timer, one per site and user
+    _timers = {}
+    _lock = threading.RLock()
+    # Salt of the in memory credentials hashes
+    _salt = os.urandom(16)
+
+    def __init__(self, share_point_site, username, password, cache_file=None, auto_renew=False, renew_before=300):
         self.Username = username
         self.Password = password
         self.share_point_site = share_point_site
+        self.cache_file = cache_file
+        self.auto_renew = auto_renew
+        self.renew_before = renew_before
+        # When the login token expires, in seconds since the epoch
+        self.expires = None
+        self._session = requests.Session()
+        self._jar = None
+        # Cookies are only reused by an Office365 with the same password
+        self._key = (share_point_site, username, self._credentials(self._salt))
+
+    def _credentials(self, salt):
+        """Salted hash of the username and password"""
+        secret = '%s\0%s' % (self.Username, self.Password)
+        return hashlib.pbkdf2_hmac('sha256', secret.encode('utf-8'), salt, 10000)
 
     def GetSecurityToken(self, username, password):
         """
@@ -54,7 +96,7 @@ class Office365(object):
               </s:Body>
             </s:Envelope>""" % (username, password, self.share_point_site)
 
-        response = requests.post(url, body)
+        response = self._session.post(url, body)
 
         xmldoc = etree.fromstring(response.content)
 
@@ -62,6 +104,13 @@ class Office365(object):
             './/{http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-secext-1.0.xsd}BinarySecurityToken'
         )
         if token is not None:
+            expires = xmldoc.find(
+                './/{*}Lifetime/{http://docs.oasis-open.org/wss/2004/01/oasis-200401-wss-wssecurity-utility-1.0.xsd}Expires'
+            )
+            if expires is not None:
+                self.expires = calendar.timegm(time.strptime(expires.text[:19], '%Y-%m-%dT%H:%M:%S'))
+            else:
+                self.expires = time.time() + 3600
             return token.text
         else:
             raise Exception('Check username/password and rootsite')
@@ -71,26 +120,187 @@ class Office365(object):
         Grabs the cookies form your Office Sharepoint site
         and uses it as Authentication for the rest of the calls
         """
+        key = self._key
+        with self._lock:
+            cached = self._cookies.get(key) or self._load_cookies()
+            if cached is not None and time.time() < cached[1] - self.renew_before:
+                jar, self.expires = cached
+            else:
+                jar = self._login(cached[0] if cached is not None else None)
+            self._cookies[key] = (jar, self.expires)
+        self._jar = jar
+        if self.auto_renew:
+            self._schedule_renewal()
+        return jar
+
+    def _login(self, jar=None):
+        """Sign in and put the new cookies into jar"""
         sectoken = self.GetSecurityToken(self.Username, self.Password)
         url = self.share_point_site+ '/_forms/default.aspx?wa=wsignin1.0'
-        response = requests.post(url, data=sectoken)
-        return response.cookies
+        self._session.cookies.clear()
+        response = self._session.post(url, data=sectoken)
+        if jar is None:
+            jar = requests.cookies.RequestsCookieJar()
+        jar.update(response.cookies)
+        if self.cache_file is not None:
+            self._save_cookies(jar)
+        return jar
+
+    def close(self):
+        """Stop renewing the cookies of this site and user in the background"""
+        with self._lock:
+            timer = self._timers.pop(self._key, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _schedule_renewal(self):
+        key = self._key
+        with self._lock:
+            timer = self._timers.get(key)
+            if timer is not None and timer.is_alive():
+                return
+            # Not too often if the token's lifetime is shorter than renew_before
+            delay = max(self.expires - self.renew_before - time.time(), 60)
+            timer = threading.Timer(delay, self._renew)
+            timer.daemon = True
+            self._timers[key] = timer
+            timer.start()
+
+    def _renew(self):
+        key = self._key
+        try:
+            # Outside the lock, other sites and users shouldn't wait on this login
+            jar = self._login(self._jar)
+            with self._lock:
+                self._cookies[key] = (jar, self.expires)
+        finally:
+            with self._lock:
+                # Unless close was called meanwhile
+                renew = self._timers.get(key) is threading.current_thread()
+                if renew:
+                    del self._timers[key]
+            if renew:
+                # Also tries again a minute later if renewing failed
+                self._schedule_renewal()
+
+    def _cache_key(self):
+        return '%s|%s' % (self.share_point_site, self.Username)
+
+    def _read_cache_file(self):
+        try:
+            with open(self.cache_file, 'rb') as f:
+                return json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            return {}
+
+    def _load_cookies(self):
+        """(cookie jar, expires) saved by another process or None
+           Only cookies saved with the same password are loaded
+        """
+        if self.cache_file is None:
+            return None
+        entry = self._read_cache_file().get(self._cache_key())
+        if entry is None or 'salt' not in entry:
+            return None
+        credentials = binascii.hexlify(self._credentials(binascii.unhexlify(entry['salt']))).decode('ascii')
+        if not hmac.compare_digest(credentials, entry.get('credentials', '')):
+            return None
+        jar = requests.cookies.RequestsCookieJar()
+        for name, value, domain, path in entry['cookies']:
+            jar.set(name, value, domain=domain, path=path)
+        return jar, entry['expires']
+
+    def _save_cookies(self, jar):
+        cache = self._read_cache_file()
+        salt = os.urandom(16)
+        cache[self._cache_key()] = {'expires': self.expires,
+                                    'salt': binascii.hexlify(salt).decode('ascii'),
+                                    'credentials': binascii.hexlify(self._credentials(salt)).decode('ascii'),
+                                    'cookies': [[cookie.name, cookie.value, cookie.domain, cookie.path]
+                                                for cookie in jar]}
+        # Only readable by its owner, it holds login cookies
+        part = '%s.%s.part' % (self.cache_file, uuid.uuid4().hex[:8])
+        fd = os.open(part, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, 'wb') as output:
+            output.write(json.dumps(cache).encode('utf-8'))
+        _replace(part, self.cache_file)
+
+
+class _UserNames(dict):
+    """Maps user names to 'ID;#Name'
+       Names that haven't been seen yet are looked up on the Site
+    """
+
+    def __init__(self, site):
+        dict.__init__(self)
+        self._site = site
+
+    def __missing__(self, name):
+        if not self._site._all_users:
+            self._site._get_user(name)
+        if name in self:
+            return dict.__getitem__(self, name)
+        raise KeyError(name)
 
 
 class Site(object):
     """Connect to SharePoint Site
     """
 
-    def __init__(self, site_url, auth=None,authcookie=None, verify_ssl=True, ssl_version=None, huge_tree=False, timeout=None):
+    _services_url = {'Alerts': '/_vti_bin/Alerts.asmx',
+                     'Authentication': '/_vti_bin/Authentication.asmx',
+                     'Copy': '/_vti_bin/Copy.asmx',
+                     'Dws': '/_vti_bin/Dws.asmx',
+                     'Forms': '/_vti_bin/Forms.asmx',
+                     'Imaging': '/_vti_bin/Imaging.asmx',
+                     'DspSts': '/_vti_bin/DspSts.asmx',
+                     'Lists': '/_vti_bin/lists.asmx',
+                     'Meetings': '/_vti_bin/Meetings.asmx',
+                     'People': '/_vti_bin/People.asmx',
+                     'Permissions': '/_vti_bin/Permissions.asmx',
+                     'SiteData': '/_vti_bin/SiteData.asmx',
+                     'Sites': '/_vti_bin/Sites.asmx',
+                     'Search': '/_vti_bin/Search.asmx',
+                     'UserGroup': '/_vti_bin/usergroup.asmx',
+                     'Versions': '/_vti_bin/Versions.asmx',
+                     'Views': '/_vti_bin/Views.asmx',
+                     'WebPartPages': '/_vti_bin/WebPartPages.asmx',
+                     'Webs': '/_vti_bin/Webs.asmx',
+                     'RequestDigest': '/_api/contextinfo',
+                     'RestWeb': '/_api/web/'
+
+                     }
+
+    def __init__(self, site_url, auth=None,authcookie=None, verify_ssl=True, ssl_version=None, huge_tree=False, timeout=None,
+                 schema_cache=None, pool_connections=10, pool_maxsize=10, pool_block=False, max_retries=0,
+                 backoff_factor=0, keep_alive=True, throttle_retries=5, max_rate=None, metric_hooks=None):
         self.site_url = site_url
         self._verify_ssl = verify_ssl
 
-        self._session = requests.Session()
+        # One pool per host shared by every List and Documents object of this Site.
+        # pool_maxsize is the number of connections kept open to a host, set it to
+        # at least the number of threads used, or set pool_block to wait for a free one.
+        # Throttled requests are tried again throttle_retries times, see ThrottledSession.
+        # metric_hooks are called with a RequestMetrics for every request, see AddMetricsHook.
+        self._metric_hooks = list(metric_hooks or [])
+        self._session = ThrottledSession(retries=throttle_retries, max_rate=max_rate,
+                                         metric_hooks=self._metric_hooks)
+        if backoff_factor and not isinstance(max_retries, Retry):
+            max_retries = Retry(total=max_retries, backoff_factor=backoff_factor)
+        adapter_options = {'pool_connections': pool_connections,
+                           'pool_maxsize': pool_maxsize,
+                           'pool_block': pool_block,
+                           'max_retries': max_retries}
+        self._session.mount('http://', HTTPAdapter(**adapter_options))
         if ssl_version is not None:
-            self._session.mount('https://', SSLAdapter(ssl_version))
+            self._session.mount('https://', SSLAdapter(ssl_version, **adapter_options))
+        else:
+            self._session.mount('https://', HTTPAdapter(**adapter_options))
 
         self._session.headers.update({'user-agent':
                                           'shareplum/%s' % __version__})
+        if not keep_alive:
+            self._session.headers['Connection'] = 'close'
 
         if authcookie is not None:
             self._session.cookies = authcookie
@@ -105,31 +315,84 @@ class Site(object):
 
         self.xml_headers = {'accept': 'application/atom+xml'}
 
-        self._services_url = {'Alerts': '/_vti_bin/Alerts.asmx',
-                              'Authentication': '/_vti_bin/Authentication.asmx',
-                              'Copy': '/_vti_bin/Copy.asmx',
-                              'Dws': '/_vti_bin/Dws.asmx',
-                              'Forms': '/_vti_bin/Forms.asmx',
-                              'Imaging': '/_vti_bin/Imaging.asmx',
-                              'DspSts': '/_vti_bin/DspSts.asmx',
-                              'Lists': '/_vti_bin/lists.asmx',
-                              'Meetings': '/_vti_bin/Meetings.asmx',
-                              'People': '/_vti_bin/People.asmx',
-                              'Permissions': '/_vti_bin/Permissions.asmx',
-                              'SiteData': '/_vti_bin/SiteData.asmx',
-                              'Sites': '/_vti_bin/Sites.asmx',
-                              'Search': '/_vti_bin/Search.asmx',
-                              'UserGroup': '/_vti_bin/usergroup.asmx',
-                              'Versions': '/_vti_bin/Versions.asmx',
-                              'Views': '/_vti_bin/Views.asmx',
-                              'WebPartPages': '/_vti_bin/WebPartPages.asmx',
-                              'Webs': '/_vti_bin/Webs.asmx',
-                              'RequestDigest': '/_api/contextinfo',
-                              'RestWeb': '/_api/web/'
-
-                              }
-
-        self.users = self.GetUsers()
+        # Optional SchemaCache for users and List schemas
+        self.schema_cache = schema_cache
+        self._list_version = None
+        self._list_version_time = 0
+
+        # Request digest shared by every Documents object, see _get_request_digest
+        self._digest = None
+        self._digest_expires = 0
+        self._digest_lock = threading.Lock()
+
+        # Users are looked up as they are needed, see users
+        self._users = {'py': _UserNames(self), 'sp': {}}
+        self._all_users = False
+        if schema_cache is not None:
+            users = schema_cache.get_users(self.site_url)
+            if users is not None:
+                self._users['py'].update(users['py'])
+                self._users['sp'].update(users['sp'])
+                self._all_users = True
+
+    @property
+    def throttle_stats(self):
+        """Requests sent, throttled and retried, seconds waited and the current rate limit"""
+        stats = self._session.stats.as_dict()
+        stats['rate'] = self._session.limiter.rate
+        return stats
+
+    def AddMetricsHook(self, hook):
+        """Call hook(metrics) with a RequestMetrics after every request
+           See shareplum.metrics for LoggingHook, PrometheusHook
+           and OpenTelemetryHook.
+        """
+        self._metric_hooks.append(hook)
+
+    def RemoveMetricsHook(self, hook):
+        """Stop calling hook, nothing is measured once no hooks are left"""
+        self._metric_hooks.remove(hook)
+
+    @property
+    def users(self):
+        """All of the Site's users, loaded on first use"""
+        if not self._all_users:
+            users = self.GetUsers()
+            self._users['py'].update(users['py'])
+            self._users['sp'].update(users['sp'])
+            self._all_users = True
+            if self.schema_cache is not None:
+                self.schema_cache.set_users(self.site_url, self._users)
+        return self._users
+
+    def _list_versions(self):
+        """Current Version of every List, keyed by both Title and ID
+           One Lists GetListCollection call checks all of the cached
+           List schemas, it is made again once older than the cache's ttl
+        """
+        ttl = self.schema_cache.ttl if self.schema_cache is not None else 0
+        if self._list_version is None or time.time() - self._list_version_time >= ttl:
+            # Build Request
+            soap_request = soap('GetListCollection')
+            self.last_request = soap_request
+
+            # Send Request
+            response = self._session.post(url=self._url('Lists'),
+                                          headers=self._headers('GetListCollection'),
+                                          data=soap_request.to_bytes(),
+                                          verify=self._verify_ssl,
+                                          timeout=self.timeout)
+
+            # Parse Response
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError('GetListCollection request failed: %s' % response.status_code, response=response)
+            envelope = _parse_response(response, self.huge_tree)
+            self._list_version = {}
+            self._list_version_time = time.time()
+            for _list in envelope[0][0][0][0]:
+                self._list_version[_list.get('Title')] = _list.get('Version')
+                self._list_version[_list.get('ID')] = _list.get('Version')
+        return self._list_version
 
     def _url(self, service):
         """Full SharePoint Service URL"""
@@ -141,19 +404,48 @@ class Site(object):
                    "SOAPAction": "http://schemas.microsoft.com/sharepoint/soap/" + soapaction}
         return headers
 
-    def _get_request_digest(self):
+    # Seconds before a request digest runs out that a new one is fetched
+    _digest_margin = 60
+
+    def _get_request_digest(self, stale=None):
         """
         Grabs the request digest which needs to be added for authentication on every rest api request
+        The digest is kept until shortly before it expires.  Pass a digest the server
+        rejected as stale to get a new one, unless another thread already replaced it.
         """
-        response = self._session.post(url=self._url('RequestDigest'),
-                                      headers=self.xml_headers,
-                                      verify=self._verify_ssl,
-                                      timeout=self.timeout)
-        xmlObj = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-
-        if response.status_code == 200:
-            return xmlObj.find("{http://schemas.microsoft.com/ado/2007/08/dataservices}FormDigestValue").text
-        raise Exception("Error Authenticating or getting Request Digest ")
+        with self._digest_lock:
+            if self._digest is not None and self._digest != stale and time.time() < self._digest_expires:
+                return self._digest
+            response = self._session.post(url=self._url('RequestDigest'),
+                                          headers=self.xml_headers,
+                                          verify=self._verify_ssl,
+                                          timeout=self.timeout)
+            if response.status_code != 200:
+                raise Exception("Error Authenticating or getting Request Digest ")
+            xmlObj = _parse_response(response, self.huge_tree)
+            self._digest = self._parse_request_digest(xmlObj)
+            self._digest_expires = time.time() + self._parse_digest_timeout(xmlObj) - self._digest_margin
+            return self._digest
+
+    def _parse_request_digest(self, xmlObj):
+        """Read the FormDigestValue from a contextinfo response"""
+        return xmlObj.find("{http://schemas.microsoft.com/ado/2007/08/dataservices}FormDigestValue").text
+
+    def _parse_digest_timeout(self, xmlObj):
+        """Read the FormDigestTimeoutSeconds from a contextinfo response, 30 minutes if it is missing"""
+        timeout = xmlObj.find("{http://schemas.microsoft.com/ado/2007/08/dataservices}FormDigestTimeoutSeconds")
+        return int(timeout.text) if timeout is not None else 1800
+
+    @property
+    def last_request(self):
+        """The last SOAP request sent, rendered when it is read"""
+        if self._last_request is None:
+            return None
+        return str(self._last_request)
+
+    @last_request.setter
+    def last_request(self, soap_request):
+        self._last_request = soap_request
 
     # This is part of List but seems awkward under the List Method
     def AddList(self, listName, description, templateID):
@@ -175,6 +467,28 @@ class Site(object):
                Survey
                Tasks
         """
+        # Build Request
+        soap_request = self._build_add_list_request(listName, description, templateID)
+        self.last_request = soap_request
+
+        # Send Request
+        response = self._session.post(url=self._url('Lists'),
+                                      headers=self._headers('AddList'),
+                                      data=soap_request.to_bytes(),
+                                      verify=self._verify_ssl,
+                                      timeout=self.timeout)
+
+        # Parse Request
+        _report(response)
+        if response == 200:
+            return response.text
+        else:
+            return response
+
+    def _build_add_list_request(self, listName, description, templateID):
+        """Build the AddList request
+           Template names are converted to their IDs
+        """
         templateIDs = {'Announcements': '104',
                        'Contacts': '105',
                        'Custom List': '100',
@@ -202,25 +516,11 @@ class Site(object):
             else:
                 templateID = templateIDs[templateID]
 
-        # Build Request
         soap_request = soap('AddList')
         soap_request.add_parameter('listName', listName)
         soap_request.add_parameter('description', description)
         soap_request.add_parameter('templateID', templateID)
-        self.last_request = str(soap_request)
-
-        # Send Request
-        response = self._session.post(url=self._url('Lists'),
-                                      headers=self._headers('AddList'),
-                                      data=str(soap_request),
-                                      verify=self._verify_ssl,
-                                      timeout=self.timeout)
-
-        # Parse Request
-        if response == 200:
-            return response.text
-        else:
-            return response
+        return soap_request
 
     def DeleteList(self, listName):
         """Delete a List with given name"""
@@ -228,16 +528,17 @@ class Site(object):
         # Build Request
         soap_request = soap('DeleteList')
         soap_request.add_parameter('listName', listName)
-        self.last_request = str(soap_request)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Lists'),
                                       headers=self._headers('DeleteList'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
         # Parse Request
+        _report(response)
         if response == 200:
             return response.text
         else:
@@ -247,50 +548,59 @@ class Site(object):
         """Returns List information for current Site"""
         # Build Request
         soap_request = soap('GetListCollection')
-        self.last_request = str(soap_request)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('SiteData'),
                                       headers=self._headers('GetListCollection'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
         # Parse Response
         if response.status_code == 200:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            result = envelope[0][0][0].text
-            lists = envelope[0][0][1]
-            data = []
-            for _list in lists:
-                _list_data = {}
-                for item in _list:
-                    key = item.tag.replace('{http://schemas.microsoft.com/sharepoint/soap/}', '')
-                    value = item.text
-                    _list_data[key] = value
-                data.append(_list_data)
-
-            return data
+            envelope = _parse_response(response, self.huge_tree)
+            return self._parse_list_collection(envelope)
         else:
             return response
 
+    def _parse_list_collection(self, envelope):
+        """Convert a SiteData GetListCollection response"""
+        result = envelope[0][0][0].text
+        lists = envelope[0][0][1]
+        data = []
+        for _list in lists:
+            _list_data = {}
+            for item in _list:
+                key = item.tag.replace('{http://schemas.microsoft.com/sharepoint/soap/}', '')
+                value = item.text
+                _list_data[key] = value
+            data.append(_list_data)
+
+        return data
+
+    def _build_users_request(self, rowlimit=0):
+        """Build the GetListItems request for the UserInfo list"""
+        soap_request = soap('GetListItems')
+        soap_request.add_parameter('listName', 'UserInfo')
+
+        # Set Row Limit
+        soap_request.add_parameter('rowLimit', str(rowlimit))
+        return soap_request
+
     def GetUsers(self, rowlimit=0):
         """Get Items from current list
            rowlimit defaulted to 0 (no limit)
         """
 
         # Build Request
-        soap_request = soap('GetListItems')
-        soap_request.add_parameter('listName', 'UserInfo')
-
-        # Set Row Limit
-        soap_request.add_parameter('rowLimit', str(rowlimit))
-        self.last_request = str(soap_request)
+        soap_request = self._build_users_request(rowlimit)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Lists'),
                                       headers=self._headers('GetListItems'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
@@ -298,18 +608,55 @@ class Site(object):
         if response.status_code != 200:
             raise ConnectionError('GetUsers GetListItems request failed')
         try:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
+            envelope = _parse_response(response, self.huge_tree)
         except:
             raise ConnectionError("GetUsers GetListItems response failed to parse correctly")
+        return self._parse_users(envelope)
+
+    def _parse_users(self, envelope):
+        """Convert the UserInfo rows to the 'py' and 'sp' user maps"""
         listitems = envelope[0][0][0][0][0]
         data = []
         for row in listitems:
             # Strip the 'ows_' from the beginning with key[4:]
             data.append({key[4:]: value for (key, value) in row.items() if key[4:]})
 
-            return {'py': {i['ImnName']: i['ID'] + ';#' + i['ImnName'] for i in data},
-                    'sp': {i['ID'] + ';#' + i['ImnName']: i['ImnName'] for i in data}}
+        return {'py': {i['ImnName']: i['ID'] + ';#' + i['ImnName'] for i in data},
+                'sp': {i['ID'] + ';#' + i['ImnName']: i['ImnName'] for i in data}}
+
+    def _get_user(self, name):
+        """Look up a single user by name and add it to the user maps"""
+        soap_request = self._build_user_request(name)
+        self.last_request = soap_request
+
+        # Send Request
+        response = self._session.post(url=self._url('Lists'),
+                                      headers=self._headers('GetListItems'),
+                                      data=soap_request.to_bytes(),
+                                      verify=self._verify_ssl,
+                                      timeout=self.timeout)
 
+        # Parse Response
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError('GetUsers GetListItems request failed', response=response)
+        envelope = _parse_response(response, self.huge_tree)
+        users = self._parse_users(envelope)
+        self._users['py'].update(users['py'])
+        self._users['sp'].update(users['sp'])
+
+    def _build_user_request(self, name):
+        """UserInfo request for the user called name"""
+        where = etree.Element('Where')
+        _type = etree.SubElement(where, 'Eq')
+        field_ref = etree.SubElement(_type, 'FieldRef')
+        field_ref.set('Name', 'Title')
+        value = etree.SubElement(_type, 'Value')
+        value.set('Type', 'Text')
+        value.text = name
+
+        soap_request = self._build_users_request(1)
+        soap_request.add_query({'Where': where})
+        return soap_request
 
     # SharePoint Method Objects
     def List(self, listName, exclude_hidden_fields=False):
@@ -318,13 +665,13 @@ class Site(object):
            The Lists Web service provides methods for working
            with SharePoint lists, content types, list items, and files.
         """
-        return _List(self._session, listName, self._url, self._verify_ssl, self.users, self.huge_tree, self.timeout, exclude_hidden_fields=exclude_hidden_fields)
+        return _List(self._session, listName, self._url, self._verify_ssl, self._users, self.huge_tree, self.timeout, exclude_hidden_fields=exclude_hidden_fields, site=self)
 
     def Documents(self, folder):
         """
         Wrapper for interacting with Share Point Rest Api for Document Library Content
         """
-        return _Documents(self._session, folder, self._url, self._verify_ssl, self.timeout, self.huge_tree,  self._get_request_digest())
+        return _Documents(self._session, folder, self._url, self._verify_ssl, self.timeout, self.huge_tree,  self._get_request_digest)
 
 
 class _Documents(object):
@@ -338,14 +685,24 @@ class _Documents(object):
         self._url = url
         self._verify_ssl = verify_ssl
         self.huge_tree = huge_tree
-        self.request_digest = request_digest
-        self.rest_api_headers = {'accept': 'application/atom+xml',  'X-RequestDigest': self.request_digest}
+        # A digest, or Site._get_request_digest to always use a current one
+        self._request_digest = request_digest
 
         self.name_spaces ={'atom': 'http://www.w3.org/2005/Atom',
                            'meta': 'http://schemas.microsoft.com/ado/2007/08/dataservices/metadata',
                            'dataservices': 'http://schemas.microsoft.com/ado/2007/08/dataservices',
                            'inline': 'http://schemas.microsoft.com/ado/2007/08/dataservices/metadata'}
 
+    @property
+    def request_digest(self):
+        if callable(self._request_digest):
+            return self._request_digest()
+        return self._request_digest
+
+    @property
+    def rest_api_headers(self):
+        return {'accept': 'application/atom+xml',  'X-RequestDigest': self.request_digest}
+
     def GetSubFolders(self):
         """
         Get's sub folders of initialized Folder in Document Object
@@ -355,17 +712,80 @@ class _Documents(object):
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
         if response.status_code == 200:
-            xmlObj = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            data = []
-            ns = self.name_spaces
-            for child in xmlObj.findall("atom:link/inline:inline/atom:feed/atom:entry/atom:content/meta:properties", ns):
-                name = child.find("dataservices:Name", ns).text
-                folder_url = child.find("dataservices:ServerRelativeUrl", ns).text
-                data.append({"folderName": name, "folderUrl": folder_url})
-            return data
+            xmlObj = _parse_response(response, self.huge_tree)
+            return self._parse_sub_folders(xmlObj)
         else:
             return response
 
+    def _parse_sub_folders(self, xmlObj):
+        """Convert a Folder response expanded with its Folders"""
+        data = []
+        for feed in xmlObj.findall("atom:link/inline:inline/atom:feed", self.name_spaces):
+            data += self._parse_folder_names(feed)
+        return data
+
+    def _parse_folder_names(self, xmlObj):
+        """Convert a Folders feed"""
+        data = []
+        ns = self.name_spaces
+        for child in xmlObj.findall("atom:entry/atom:content/meta:properties", ns):
+            name = child.find("dataservices:Name", ns).text
+            folder_url = child.find("dataservices:ServerRelativeUrl", ns).text
+            data.append({"folderName": name, "folderUrl": folder_url})
+        return data
+
+    def Walk(self, folder_name=None, workers=4):
+        """
+        Walks the whole folder tree, listing up to workers folders at a time
+        Each folder is yielded as soon as it is listed, with its path relative to
+        the starting folder, its files as in GetDocumentFolderFileNames and its sub folders.
+        :param folder_name: Share Point Folder name or Relative url to start from, defaults to the initialized Folder
+        :param workers: Number of folders listed at the same time
+        :return: Generator of {"folderName", "folderUrl", "path", "files", "folders"}
+        """
+        if folder_name is None: folder_name = self.folder
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pending = {executor.submit(self._list_folder, folder_name): ()}
+            while pending:
+                done, not_done = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    path = pending.pop(future)
+                    folder = future.result()
+                    folder['path'] = '/'.join(path)
+                    for sub_folder in folder['folders']:
+                        pending[executor.submit(self._list_folder, sub_folder['folderUrl'])] = path + (sub_folder['folderName'],)
+                    yield folder
+
+    def _list_folder(self, folder_name):
+        """Files and sub folders of a folder in one request"""
+        response = self._session.get("%sGetFolderByServerRelativeUrl('%s')?$expand=Files,Folders" % (self._url('RestWeb'), folder_name),
+                                     headers=self.rest_api_headers,
+                                     verify=self._verify_ssl,
+                                     timeout=self.timeout)
+        if response.status_code != 200:
+            raise requests.exceptions.HTTPError('Listing %s failed: %s' % (folder_name, response.status_code), response=response)
+        xmlObj = _parse_response(response, self.huge_tree)
+        return self._parse_folder(xmlObj)
+
+    def _parse_folder(self, xmlObj):
+        """Convert a Folder response expanded with its Files and Folders"""
+        ns = self.name_spaces
+        properties = xmlObj.find("atom:content/meta:properties", ns)
+        folder = {"folderName": properties.find("dataservices:Name", ns).text,
+                  "folderUrl": properties.find("dataservices:ServerRelativeUrl", ns).text,
+                  "files": [],
+                  "folders": []}
+        # Both feeds are links, told apart by their title
+        for link in xmlObj.findall("atom:link", ns):
+            feed = link.find("inline:inline/atom:feed", ns)
+            if feed is None:
+                continue
+            if link.get('title') == 'Files':
+                folder['files'] = self._parse_file_names(feed)
+            elif link.get('title') == 'Folders':
+                folder['folders'] = self._parse_folder_names(feed)
+        return folder
+
     def GetDocumentFolderFileNames(self, folder_name=None):
         """
         Get all of the file names in a folder
@@ -379,73 +799,472 @@ class _Documents(object):
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
         if response.status_code == 200:
-            xmlObj = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            data = []
-            ns = self.name_spaces
-            for child in xmlObj.findall("atom:entry/atom:content/meta:properties", ns):
-                    name = child.find("dataservices:Name", ns).text
-                    url = child.find("dataservices:ServerRelativeUrl", ns).text
-                    # i'm not sure are these fields are default or not
-                    created_at = child.find("dataservices:TimeCreated", ns)
-                    if created_at is not None:
-                        created_at = created_at.text
-                    else:
-                        created_at = ''
-                    updated_at = child.find("dataservices:TimeLastModified", ns)
-                    if updated_at is not None:
-                        updated_at = updated_at.text
-                    else:
-                        updated_at = ''
-                    data.append({"fileName": name, "url": url, "created_at": created_at, "updated_at": updated_at})
-            return data
+            xmlObj = _parse_response(response, self.huge_tree)
+            return self._parse_file_names(xmlObj)
         else:
             return response
 
-    def GetFileByRelativeUrl(self, relative_url, file_name, directory_to_save):
+    def _parse_file_names(self, xmlObj):
+        """Convert a Files feed response"""
+        data = []
+        ns = self.name_spaces
+        for child in xmlObj.findall("atom:entry/atom:content/meta:properties", ns):
+                name = child.find("dataservices:Name", ns).text
+                url = child.find("dataservices:ServerRelativeUrl", ns).text
+                # i'm not sure are these fields are default or not
+                created_at = child.find("dataservices:TimeCreated", ns)
+                if created_at is not None:
+                    created_at = created_at.text
+                else:
+                    created_at = ''
+                updated_at = child.find("dataservices:TimeLastModified", ns)
+                if updated_at is not None:
+                    updated_at = updated_at.text
+                else:
+                    updated_at = ''
+                length = child.find("dataservices:Length", ns)
+                length = length.text if length is not None else ''
+                etag = child.find("dataservices:ETag", ns)
+                etag = etag.text if etag is not None else ''
+                data.append({"fileName": name, "url": url, "created_at": created_at, "updated_at": updated_at,
+                             "length": length, "etag": etag})
+        return data
+
+    def GetFileByRelativeUrl(self, relative_url, file_name, directory_to_save, progress=None, chunk_size=1024 * 1024):
         """
         Down loads a single file
+        The body is written to a temporary file in chunks as it arrives
+        and renamed into place once complete, so memory use doesn't grow
+        with the file size and a failed download never leaves a partial file.
         :param relative_url: Share Point File relative url
         :param file_name: The name the file is saved as in Share Point
         :param directory_to_save: Local Directory to save the file to
+        :param progress: Called as progress(relative_url, bytes_done, total_bytes) after each chunk
+        :param chunk_size: Bytes read from the connection at a time
         :return:
         """
+        response = self._get_file(relative_url, file_name, directory_to_save, progress, chunk_size)
+        if response.status_code == 200:
+            return os.path.join(directory_to_save, file_name)
+        return response
+
+    def _get_file(self, relative_url, file_name, directory_to_save, progress=None, chunk_size=1024 * 1024, etag=None):
+        """Download a file and return the closed response
+           With etag the file is only downloaded if it no longer matches (304 otherwise)
+        """
+        headers = self.rest_api_headers
+        if etag:
+            headers = dict(headers, **{'If-None-Match': etag})
         response = self._session.get(
             "%sGetFileByServerRelativeUrl('%s')/$value" % (self._url('RestWeb'), relative_url),
-            headers=self.rest_api_headers,
+            headers=headers,
             verify=self._verify_ssl,
-            timeout=self.timeout)
-        if response.status_code == 200:
-            if not os.path.exists(directory_to_save):
-                os.makedirs(directory_to_save)
-            with open(os.path.join(directory_to_save, file_name), "wb") as output:
-                output.write(response.content)
-            return os.path.join(directory_to_save, file_name)
+            timeout=self.timeout,
+            stream=True)
+        if response.status_code != 200:
+            # Read the error body so the caller still has it once the connection is closed
+            response.content
+            response.close()
+            return response
+
+        total = response.headers.get('Content-Length')
+        total = int(total) if total else None
+        path = os.path.join(directory_to_save, file_name)
+        done = 0
+        part = None
+        try:
+            # Inside the try so the response is closed if the directory or file can't be made
+            output, part = _part_file(directory_to_save, file_name)
+            with output:
+                for chunk in response.iter_content(chunk_size):
+                    output.write(chunk)
+                    done += len(chunk)
+                    if progress is not None:
+                        progress(relative_url, done, total)
+            _replace(part, path)
+        except BaseException:
+            if part is not None:
+                os.remove(part)
+            raise
+        finally:
+            _report(response, bytes_received=done)
+            response.close()
         return response
 
-    def GetAllFilesInFolder(self, directory_to_save, include_sub_folders=False):
+    def GetAllFilesInFolder(self, directory_to_save, include_sub_folders=False, workers=1, progress=None):
         """
         Downloads all of the files in the folder
         :param directory_to_save: Local directory to save the files to
         :param include_sub_folders: If you would also like to download sub folders and mirror the file structure of the Share Point Document library.
+        :param workers: Number of files downloaded and folders listed at the same time
+        :param progress: Passed on to GetFileByRelativeUrl
         :return:
         """
         if include_sub_folders:
-            sub_folders = self.GetSubFolders()
-            sub_folders.append({"folderName": self.folder, "folderUrl": self.folder})
-            for folder in sub_folders:
-                files_in_folder = self.GetDocumentFolderFileNames(folder['folderUrl'])
-                for file in files_in_folder:
-                    final_save_location = os.path.join(directory_to_save, folder['folderName'])
-                    if folder['folderName'] == self.folder: final_save_location = directory_to_save
-                    self.GetFileByRelativeUrl(file['url'], file['fileName'], final_save_location)
+            # Downloads start while the rest of the tree is still being listed
+            def downloads():
+                for folder in self.Walk(workers=workers):
+                    final_save_location = _local_path(directory_to_save, folder['path'])
+                    for file in folder['files']:
+                        yield (file['url'], file['fileName'], final_save_location)
+            self._download_files(downloads(), workers, progress)
             return directory_to_save
+
         list_of_file_names = self.GetDocumentFolderFileNames()
         if not list_of_file_names:
             return "Not valid folder or No Files in the folder."
-        for file_in_sharepoint in list_of_file_names:
-            self.GetFileByRelativeUrl(file_in_sharepoint['url'], file_in_sharepoint['fileName'], directory_to_save)
+        downloads = [(file_in_sharepoint['url'], file_in_sharepoint['fileName'], directory_to_save)
+                     for file_in_sharepoint in list_of_file_names]
+        self._download_files(downloads, workers, progress)
         return directory_to_save
 
+    def Sync(self, directory_to_save, include_sub_folders=True, workers=4, progress=None, manifest=None):
+        """
+        Brings a local copy of the folder up to date
+        A JSON manifest keeps the TimeLastModified, Length and ETag of every file
+        downloaded, so later runs only download files that are new or changed.
+        Files removed from Share Point since the last run are deleted locally.
+        :param directory_to_save: Local directory to save the files to
+        :param include_sub_folders: Also sync sub folders, keeping the folder structure
+        :param workers: Number of files downloaded and folders listed at the same time
+        :param progress: Passed on to GetFileByRelativeUrl
+        :param manifest: Manifest file, defaults to .shareplum-sync.json in directory_to_save
+        :return: Dict of the relative urls downloaded, unchanged, deleted and failed
+        """
+        sync = _Sync(directory_to_save, manifest)
+        if include_sub_folders:
+            folders = self.Walk(workers=workers)
+        else:
+            folders = [dict(self._list_folder(self.folder), path='')]
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            downloads = []
+            for folder in folders:
+                for file in folder['files']:
+                    download = sync.check(folder, file)
+                    if download is None:
+                        continue
+                    url, entry, old_entry, etag = download
+                    future = executor.submit(self._get_file, url, file['fileName'],
+                                             _local_path(directory_to_save, folder['path']), progress, etag=etag)
+                    downloads.append((url, entry, old_entry, future))
+
+            for url, entry, old_entry, future in downloads:
+                response = future.result()
+                sync.downloaded(url, entry, old_entry, response.status_code, response.headers.get('ETag', ''))
+        return sync.finish()
+
+    def UploadFile(self, file, file_name=None, folder_name=None, overwrite=True, chunk_size=10 * 1024 * 1024,
+                   progress=None):
+        """
+        Uploads a file
+        Files larger than chunk_size are sent a chunk at a time with StartUpload,
+        ContinueUpload and FinishUpload, so the whole file is never held in memory.
+        :param file: Local file path or file object opened in binary mode
+        :param file_name: The name to save the file as in Share Point, defaults to the local file name
+        :param folder_name: Share Point Folder name or Relative url, defaults to the initialized Folder
+        :param overwrite: Replace a file with the same name
+        :param chunk_size: Bytes sent per request
+        :param progress: Called as progress(file_name, bytes_done) after each chunk
+        :return: Share Point File relative url or request response if it fails
+        """
+        if not hasattr(file, 'read'):
+            with open(file, 'rb') as f:
+                return self.UploadFile(f, file_name or os.path.basename(file), folder_name, overwrite, chunk_size,
+                                       progress)
+        if file_name is None: file_name = os.path.basename(file.name)
+        if folder_name is None: folder_name = self.folder
+
+        chunks = _read_chunks(file, chunk_size)
+        chunk, last = next(chunks)
+        # Small files are sent whole, larger ones are added empty and then filled in
+        response = self._post(self._add_file_url(folder_name, file_name, overwrite), chunk if last else b'')
+        if response.status_code != 200:
+            return response
+        xmlObj = _parse_response(response, self.huge_tree)
+        relative_url = self._parse_added_file(xmlObj)
+        if last:
+            if progress is not None:
+                progress(file_name, len(chunk))
+            return relative_url
+
+        upload_id = str(uuid.uuid4())
+        offset = 0
+        step = 'StartUpload'
+        while True:
+            response = self._post(self._upload_url(relative_url, step, upload_id, offset), chunk)
+            if response.status_code != 200:
+                _report(self._post(self._upload_url(relative_url, 'CancelUpload', upload_id), b''))
+                return response
+            _report(response)
+            offset += len(chunk)
+            if progress is not None:
+                progress(file_name, offset)
+            if last:
+                return relative_url
+            chunk, last = next(chunks)
+            step = 'FinishUpload' if last else 'ContinueUpload'
+
+    def UploadFiles(self, files, folder_name=None, workers=4, overwrite=True, chunk_size=10 * 1024 * 1024,
+                    progress=None):
+        """
+        Uploads several local files at the same time
+        :param files: Local file paths
+        :param workers: Number of files uploaded at the same time
+        :return: List of UploadFile results in the order of files
+        """
+        def upload(file):
+            return self.UploadFile(file, folder_name=folder_name, overwrite=overwrite, chunk_size=chunk_size,
+                                   progress=progress)
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(upload, files))
+
+    def _post(self, url, data):
+        headers = self.rest_api_headers
+        response = self._session.post(url,
+                                      headers=headers,
+                                      data=data,
+                                      verify=self._verify_ssl,
+                                      timeout=self.timeout)
+        if response.status_code == 403 and callable(self._request_digest):
+            # The digest may have run out, try once more with a new one
+            self._request_digest(stale=headers['X-RequestDigest'])
+            response = self._session.post(url,
+                                          headers=self.rest_api_headers,
+                                          data=data,
+                                          verify=self._verify_ssl,
+                                          timeout=self.timeout)
+        return response
+
+    def _add_file_url(self, folder_name, file_name, overwrite):
+        return "%sGetFolderByServerRelativeUrl('%s')/Files/add(url='%s',overwrite=%s)" % (
+            self._url('RestWeb'), folder_name, file_name.replace("'", "''"), 'true' if overwrite else 'false')
+
+    def _upload_url(self, relative_url, step, upload_id, offset=None):
+        """Url of a chunked upload step, every step but StartUpload needs the offset"""
+        url = "%sGetFileByServerRelativeUrl('%s')/%s(uploadId=guid'%s'" % (
+            self._url('RestWeb'), relative_url.replace("'", "''"), step, upload_id)
+        if step in ('ContinueUpload', 'FinishUpload'):
+            url += ",fileOffset=%d" % offset
+        return url + ")"
+
+    def _parse_added_file(self, xmlObj):
+        """Read the ServerRelativeUrl of a Files/add response"""
+        ns = self.name_spaces
+        return xmlObj.find("atom:content/meta:properties/dataservices:ServerRelativeUrl", ns).text
+
+    def _download_files(self, downloads, workers, progress):
+        """Download (relative url, file name, directory) tuples with a pool of workers"""
+        def download(args):
+            return self.GetFileByRelativeUrl(*args, progress=progress)
+
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                return list(executor.map(download, downloads))
+        return [download(args) for args in downloads]
+
+
+def _local_path(directory_to_save, path):
+    """Local directory for a folder path from Walk"""
+    return os.path.join(directory_to_save, *path.split('/')) if path else directory_to_save
+
+
+def _read_chunks(file, chunk_size):
+    """(chunk, is last chunk) pairs read from a file object"""
+    chunk = file.read(chunk_size)
+    while True:
+        next_chunk = file.read(chunk_size) if len(chunk) == chunk_size else b''
+        yield chunk, not next_chunk
+        if not next_chunk:
+            return
+        chunk = next_chunk
+
+
+def _remove_local(directory_to_save, path):
+    """Delete a synced file and any folders it leaves empty"""
+    path = _local_path(directory_to_save, path)
+    if os.path.exists(path):
+        os.remove(path)
+    folder = os.path.dirname(path)
+    while os.path.abspath(folder) != os.path.abspath(directory_to_save):
+        try:
+            os.rmdir(folder)
+        except OSError:
+            # Not empty
+            break
+        folder = os.path.dirname(folder)
+
+
+class _Sync(object):
+    """Manifest bookkeeping of Documents.Sync
+       check each listed file, call downloaded with the status of the
+       ones it returns a download for, then finish to delete the files
+       removed from Share Point and save the manifest.
+    """
+
+    def __init__(self, directory_to_save, manifest=None):
+        self.directory_to_save = directory_to_save
+        if manifest is None:
+            manifest = os.path.join(directory_to_save, '.shareplum-sync.json')
+        self.manifest = manifest
+        try:
+            with open(manifest, 'rb') as f:
+                self.old_files = json.loads(f.read().decode('utf-8'))
+        except (IOError, OSError, ValueError):
+            self.old_files = {}
+        self.new_files = {}
+        self.result = {'downloaded': [], 'unchanged': [], 'deleted': [], 'failed': []}
+
+    def check(self, folder, file):
+        """(url, entry, old entry, etag) of a file to download, None if it is unchanged
+           With an etag the server can still answer 304 if only the metadata changed
+        """
+        url = file['url']
+        path = '/'.join([folder['path'], file['fileName']]) if folder['path'] else file['fileName']
+        entry = {'path': path, 'modified': file['updated_at'], 'length': file['length'], 'etag': file['etag']}
+        old_entry = self.old_files.get(url)
+        exists = old_entry is not None and old_entry['path'] == path and \
+            os.path.exists(_local_path(self.directory_to_save, path))
+        if exists and old_entry == entry:
+            self.new_files[url] = entry
+            self.result['unchanged'].append(url)
+            return None
+        return url, entry, old_entry, old_entry['etag'] if exists else None
+
+    def downloaded(self, url, entry, old_entry, status, etag):
+        """Record a download's status, etag is the response's ETag header"""
+        if status == 200:
+            entry['etag'] = entry['etag'] or etag
+            self.result['downloaded'].append(url)
+        elif status == 304:
+            self.result['unchanged'].append(url)
+        else:
+            self.result['failed'].append(url)
+            if old_entry is None:
+                return
+            # Keep the old entry so it is tried again next time
+            entry = old_entry
+        self.new_files[url] = entry
+
+    def finish(self):
+        """Delete the files no longer listed, save the manifest and return the result"""
+        result = self.result
+        listed = set(result['downloaded'] + result['unchanged'] + result['failed'])
+        for url, entry in self.old_files.items():
+            if url in listed:
+                continue
+            _remove_local(self.directory_to_save, entry['path'])
+            result['deleted'].append(url)
+
+        output, part = _part_file(os.path.dirname(self.manifest) or '.', os.path.basename(self.manifest))
+        with output:
+            output.write(json.dumps(self.new_files, indent=1, sort_keys=True).encode('utf-8'))
+        _replace(part, self.manifest)
+        return result
+
+
+def _part_file(directory_to_save, file_name):
+    """Open a temporary file next to where file_name will be saved"""
+    try:
+        os.makedirs(directory_to_save)
+    except OSError:
+        # Already there, possibly made by another download
+        if not os.path.isdir(directory_to_save):
+            raise
+    # Not mkstemp, its files are only readable by their owner
+    part = os.path.join(directory_to_save, '.%s.%s.part' % (file_name, uuid.uuid4().hex[:8]))
+    return open(part, 'wb'), part
+
+
+# os.replace is Python 3 only, os.rename also overwrites on POSIX
+_replace = getattr(os, 'replace', os.rename)
+
+
+def _parse_response(response, huge_tree):
+    """Parse an XML response body and report its metrics"""
+    metrics = getattr(response, 'metrics', None)
+    if metrics is None:
+        return etree.fromstring(response.content, parser=etree.XMLParser(huge_tree=huge_tree))
+    start = _timer()
+    try:
+        return etree.fromstring(response.content, parser=etree.XMLParser(huge_tree=huge_tree))
+    finally:
+        metrics.parse_time = _timer() - start
+        metrics.emit()
+
+
+def _report(response, **values):
+    """Report the metrics of a response once the caller is done with it"""
+    metrics = getattr(response, 'metrics', None)
+    if metrics is None:
+        return
+    for name, value in values.items():
+        setattr(metrics, name, value)
+    if metrics.bytes_received is None:
+        # Bytes read from the socket so far for streamed responses
+        tell = getattr(response.raw, 'tell', None)
+        if tell is not None:
+            metrics.bytes_received = tell()
+    metrics.emit()
+
+
+_text_type = type('')
+
+
+def _escape_text(value):
+    """XML text of a value, escaped like lxml does"""
+    if not isinstance(value, _text_type):
+        value = '%s' % (value,)
+    return value.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;').replace('\r', '&#13;')
+
+
+def _merge_pages(pages, as_columns):
+    """Join the rows, or ListColumns, of the ID ranges"""
+    if as_columns:
+        data = pages[0]
+        for page in pages[1:]:
+            data.extend(page)
+        return data
+    return [row for page in pages for row in page]
+
+
+def _update_chunks(data, chunk_size):
+    """(start index, rows) batches of UpdateListItems' data, at least one"""
+    chunk_size = int(chunk_size) if chunk_size else len(data) or 1
+    return [(start, data[start:start + chunk_size]) for start in range(0, len(data), chunk_size)] or [(0, [])]
+
+
+def _bulk_rows(data):
+    """(column, value) pairs of each row of BulkInsert's data"""
+    if isinstance(data, ListColumns):
+        data = data.to_dict()
+    if isinstance(data, dict):
+        names = list(data)
+        return (zip(names, values) for values in zip(*[data[name] for name in names]))
+    return (row.items() for row in data)
+
+
+def _unchanged(value):
+    return value
+
+
+def _drop_element(element):
+    """Free a parsed element and anything already parsed before it"""
+    element.clear()
+    while element.getprevious() is not None:
+        del element.getparent()[0]
+
+
+try:
+    _fixed_datetime = datetime.fromisoformat
+except AttributeError:
+    # Python < 3.7
+    def _fixed_datetime(value):
+        return datetime(int(value[0:4]), int(value[5:7]), int(value[8:10]),
+                        int(value[11:13]), int(value[14:16]), int(value[17:19]))
+
+
 class _List(object):
     """Sharepoint Lists Web Serviceuntitled:Untitled-1
        Microsoft Developer Network:
@@ -453,8 +1272,9 @@ class _List(object):
        with SharePoint lists, content types, list items, and files.
     """
 
-    def __init__(self, session, listName, url, verify_ssl, users, huge_tree, timeout, exclude_hidden_fields=False ):
+    def __init__(self, session, listName, url, verify_ssl, users, huge_tree, timeout, exclude_hidden_fields=False, site=None):
         self._session = session
+        self._site = site
         self.listName = listName
         self._url = url
         self._verify_ssl = verify_ssl
@@ -462,20 +1282,72 @@ class _List(object):
         self.huge_tree = huge_tree
         self.timeout = timeout
         self._exclude_hidden_fields = exclude_hidden_fields
-        # List Info
-        self.fields = []
-        self.regional_settings = {}
-        self.server_settings = {}
-        self.GetList()
-        self.views = self.GetViewCollection()
+        # List Info (fields, settings and views) is loaded on first use
+        # Compiled converters, see _row_converter
+        self._converters = {}
+        self._row_converters = {}
+        self.last_request = None
+        self.date_format = re.compile('\d+-\d+-\d+ \d+:\d+:\d+')
+
+    def __getattr__(self, name):
+        """Load the List Info the first time it is used"""
+        if name not in ('fields', 'regional_settings', 'server_settings', '_sp_cols', '_disp_cols', 'views'):
+            raise AttributeError(name)
+        if not self._load_cached_schema():
+            if name == 'views':
+                self.views = self.GetViewCollection()
+            else:
+                self.GetList()
+        return object.__getattribute__(self, name)
+
+    def _load_cached_schema(self):
+        """Load the List Info through the Site's SchemaCache
+           A stale entry is kept if the List's Version hasn't changed,
+           otherwise the List Info is downloaded and saved again.
+           Returns False when there is no cache.
+        """
+        cache = getattr(self._site, 'schema_cache', None)
+        if cache is None:
+            return False
+        site_url = self._site.site_url
+
+        cached = cache.get_list(site_url, self.listName)
+        if cached is not None:
+            version, fresh, data = cached
+            if not fresh and self._site._list_versions().get(self.listName) == version:
+                cache.touch_list(site_url, self.listName)
+                fresh = True
+            if fresh:
+                self.fields = list(data['fields'])
+                self.regional_settings = data['regional_settings']
+                self.server_settings = data['server_settings']
+                self.views = data['views']
+                self._set_columns()
+                return True
 
+        self.GetList()
+        views = self.GetViewCollection()
+        self.views = views
+        # GetViewCollection returns a tuple when it fails, don't keep that
+        if type(views) == dict:
+            cache.set_list(site_url, self.listName, self._version, {'fields': self._all_fields,
+                                                                    'regional_settings': self.regional_settings,
+                                                                    'server_settings': self.server_settings,
+                                                                    'views': views})
+        return True
+
+    def _set_columns(self):
+        """Build the internal and display column maps from self.fields"""
         # fields sometimes share the same displayname
         # filtering fields to only contain visible fields, minimizes the chance of a one field hiding another
-        if exclude_hidden_fields:
+        if self._exclude_hidden_fields:
             self.fields = [field for field in self.fields if field.get("Hidden", "FALSE") == "FALSE"]
 
         self._sp_cols = {i['Name']: {'name': i['DisplayName'], 'type': i['Type']} for i in self.fields}
         self._disp_cols = {i['DisplayName']: {'name': i['Name'], 'type': i['Type']} for i in self.fields}
+        # Compiled converters, see _row_converter
+        self._converters = {}
+        self._row_converters = {}
 
         title_col = self._sp_cols['Title']['name']
         title_type = self._sp_cols['Title']['type']
@@ -486,8 +1358,17 @@ class _List(object):
         #                 if i['StaticName'] == 'Title' or i['SourceID'] != standard_source}
         # self._disp_cols = {i['DisplayName']: {'name': i['Name'], 'type': i['Type']} for i in self.fields \
         #                   if i['StaticName'] == 'Title' or i['SourceID'] != standard_source}
-        self.last_request = None
-        self.date_format = re.compile('\d+-\d+-\d+ \d+:\d+:\d+')
+
+    @property
+    def last_request(self):
+        """The last SOAP request sent, rendered when it is read"""
+        if self._last_request is None:
+            return None
+        return str(self._last_request)
+
+    @last_request.setter
+    def last_request(self, soap_request):
+        self._last_request = soap_request
 
     def _url(self, service):
         """Full SharePoint Service URL"""
@@ -518,39 +1399,83 @@ class _List(object):
 
     def _python_type(self, key, value):
         """Returns proper type from the schema"""
-        try:
-            field_type = self._sp_cols[key]['type']
-            if field_type in ['Number', 'Currency']:
-                return float(value)
-            elif field_type == 'DateTime':
+        return self._converter(key)(value)
 
+    def _converter(self, key):
+        """Function converting values of column key to their Python type
+           Picked once per column from the schema
+        """
+        sp_cols = self._sp_cols
+        if key in self._converters:
+            return self._converters[key]
 
-                # Need to remove the '123;#' from created dates, but we will do it for all dates
-                # self.date_format = re.compile('\d+-\d+-\d+ \d+:\d+:\d+')
-                value = self.date_format.search(value).group(0)
-                
-                # NOTE: I used to round this just date (7/28/2018)
-                return datetime.strptime(value, '%Y-%m-%d %H:%M:%S')
+        if key not in sp_cols:
+            def converter(value):
+                raise Exception(key + ' not a column in current List.')
+        else:
+            field_type = sp_cols[key]['type']
+            if field_type in ['Number', 'Currency']:
+                converter = float
+            elif field_type == 'DateTime':
+                converter = self._python_datetime
             elif field_type == 'Boolean':
-                if value == '1':
-                    return 'Yes'
-                elif value == '0':
-                    return 'No'
-                else:
-                    return ''
+                converter = self._python_boolean
             elif field_type in ('User', 'UserMulti'):
-                # Sometimes the User no longer exists or
-                # has a diffrent ID number so we just remove the "123;#"
-                # from the beginning of their name
-                if value in self.users['sp']:
-                    return self.users['sp'][value]
-                elif '#' in value:
-                    return value.split('#')[1]
-                else:
-                    return value
+                converter = self._python_user
             else:
-                return value
-        except AttributeError:
+                converter = _unchanged
+        self._converters[key] = converter
+        return converter
+
+    def _row_converter(self, viewfields):
+        """Tables converting 'ows_Column_x0020_Title' to 'Column Title'
+           and its value to the Python type, built once per viewfields
+        """
+        sp_cols = self._sp_cols
+        cache_key = tuple(viewfields)
+        if cache_key not in self._row_converters:
+            names = {}
+            converters = {}
+            for key in viewfields:
+                names['ows_' + key] = sp_cols[key]['name'] if key in sp_cols else key
+                converters['ows_' + key] = self._converter(key)
+            self._row_converters[cache_key] = (names, converters)
+        return self._row_converters[cache_key]
+
+    def _python_datetime(self, value):
+        """'2018-07-28 13:05:00' to datetime"""
+        # Almost every value is exactly 'YYYY-MM-DD HH:MM:SS', parse that directly
+        if len(value) == 19 and value[4] == '-' and value[10] == ' ':
+            try:
+                return _fixed_datetime(value)
+            except ValueError:
+                pass
+
+        # Need to remove the '123;#' from created dates, but we will do it for all dates
+        match = self.date_format.search(value)
+        if match is None:
+            return value
+
+        # NOTE: I used to round this just date (7/28/2018)
+        return datetime.strptime(match.group(0), '%Y-%m-%d %H:%M:%S')
+
+    def _python_boolean(self, value):
+        if value == '1':
+            return 'Yes'
+        elif value == '0':
+            return 'No'
+        else:
+            return ''
+
+    def _python_user(self, value):
+        # Sometimes the User no longer exists or
+        # has a diffrent ID number so we just remove the "123;#"
+        # from the beginning of their name
+        if value in self.users['sp']:
+            return self.users['sp'][value]
+        elif '#' in value:
+            return value.split('#')[1]
+        else:
             return value
 
     def _sp_type(self, key, value):
@@ -575,13 +1500,17 @@ class _List(object):
         except AttributeError:
             return value
 
-    def GetListItems(self, viewname=None, fields=None, query=None, rowlimit=0, debug=False):
-        """Get Items from current list
-           rowlimit defaulted to 0 (unlimited)
+    def _build_list_items_request(self, viewname=None, fields=None, query=None, rowlimit=0, position=None, viewfields=None,
+                                  command='GetListItems'):
+        """Build the GetListItems request
+           Returns the soap request and the
+           viewfields that will be kept from each row
+           Pass viewfields from an earlier call to skip the GetView lookup
         """
+        fields, query = self._split_query(fields, query)
 
         # Build Request
-        soap_request = soap('GetListItems')
+        soap_request = soap(command)
         soap_request.add_parameter('listName', self.listName)
         # Convert Displayed View Name to View ID
         if viewname:
@@ -590,8 +1519,7 @@ class _List(object):
         # Add viewFields
         if fields:
             # Convert to SharePoint Style Column Names
-            for i, val in enumerate(fields):
-                fields[i] = self._disp_cols[val]['name']
+            fields = [self._disp_cols[val]['name'] for val in fields]
             viewfields = fields
             soap_request.add_view_fields(fields)
             # Check for viewname and query
@@ -601,7 +1529,8 @@ class _List(object):
                 soap_request.add_query({'OrderBy': ['ID']})
 
         elif viewname:
-            viewfields = self.GetView(viewname)['fields']  ## Might be wrong
+            if viewfields is None:
+                viewfields = self.GetView(viewname)['fields']  ## Might be wrong
         else:
             # No fields or views provided so get everything
             viewfields = [x for x in self._sp_cols]
@@ -612,104 +1541,466 @@ class _List(object):
             if 'Where' in query:
                 where = etree.Element('Where')
 
-                parents = []
-                parents.append(where)
-                for i, field in enumerate(query['Where']):
-                    if field == 'And':
-                        parents.append(etree.SubElement(parents[-1], 'And'))
-                    elif field == 'Or':
-                        if parents[-1].tag == 'Or':
-                            parents.pop()
-                        parents.append(etree.SubElement(parents[-1], 'Or'))
-                    else:
-                        _type = etree.SubElement(parents[-1], field[0])
-                        field_ref = etree.SubElement(_type, 'FieldRef')
-                        field_ref.set('Name', self._disp_cols[field[1]]['name'])
-                        if len(field) == 3:
-                            value = etree.SubElement(_type, 'Value')
-                            value.set('Type', self._disp_cols[field[1]]['type'])
-                            value.text = self._sp_type(field[1], field[2])
+                condition = query['Where']
+                if not isinstance(condition, Condition):
+                    condition = Tokens(condition) if condition else None
+                if condition is not None:
+                    where.append(condition.element(self))
 
-                query['Where'] = where
+                # Don't overwrite the caller's query so it can be reused
+                query = dict(query, Where=where)
 
             soap_request.add_query(query)
 
         # Set Row Limit
         soap_request.add_parameter('rowLimit', str(rowlimit))
-        self.last_request = str(soap_request)
+
+        # Continue from the previous page
+        if position:
+            soap_request.add_query_options({'Paging': {'ListItemCollectionPositionNext': position}})
+
+        return soap_request, viewfields
+
+    def _split_query(self, fields, query):
+        """fields and the dict form of a query, which can be a caml.Query
+           The Query's select is used when no fields are given.
+        """
+        if isinstance(query, Query):
+            if fields is None:
+                fields = query.select
+            query = query.as_dict() or None
+            # Query sorts and groups by display names, CAML takes the internal ones
+            for key in ('OrderBy', 'GroupBy'):
+                if query and key in query:
+                    query[key] = [self._internal_order(field) for field in query[key]]
+        return fields, query
+
+    def _internal_order(self, field):
+        """Internal name of an OrderBy or GroupBy column, keeping ('Column', 'DESCENDING')"""
+        if isinstance(field, tuple):
+            return (self._internal_order(field[0]),) + field[1:]
+        try:
+            return self._disp_cols[field]['name']
+        except KeyError:
+            raise Exception(field + ' not a column in current List.')
+
+    def _stream_list_items(self, response, viewfields, add_row=None):
+        """Convert the rows of a streamed GetListItems response
+           The body is parsed straight from the socket and each
+           z:row is cleared once it is converted so memory stays flat.
+           The first value yielded is the position of the next page,
+           followed by the rows.
+           With add_row each z:row element is passed to it instead.
+        """
+        # Let urllib3 undo any gzip/deflate Content-Encoding for us
+        response.raw.decode_content = True
+        events = etree.iterparse(response.raw,
+                                 events=('start', 'end'),
+                                 tag=('{urn:schemas-microsoft-com:rowset}data', '{#RowsetSchema}row'),
+                                 huge_tree=self.huge_tree)
+        # Time spent in lxml and in converting, leaving out the caller's time between rows
+        timed = getattr(response, 'metrics', None) is not None
+        parse_time = convert_time = 0.0
+        rows = 0
+        clock = _timer() if timed else 0.0
+        try:
+            for event, element in events:
+                if timed:
+                    now = _timer()
+                    parse_time += now - clock
+                    clock = now
+                if element.tag == '{urn:schemas-microsoft-com:rowset}data':
+                    if event == 'start':
+                        yield element.get('ListItemCollectionPositionNext')
+                        if timed:
+                            clock = _timer()
+                    continue
+                if event == 'end':
+                    rows += 1
+                    if add_row is None:
+                        row = self._pop_row(element, viewfields)
+                        if timed:
+                            convert_time += _timer() - clock
+                        yield row
+                    else:
+                        add_row(element)
+                        _drop_element(element)
+                        if timed:
+                            convert_time += _timer() - clock
+                    if timed:
+                        clock = _timer()
+        finally:
+            if timed:
+                _report(response, parse_time=parse_time, convert_time=convert_time, rows=rows)
+            response.close()
+
+    def _pop_row(self, element, viewfields):
+        """Convert a parsed z:row and drop it from the tree"""
+        names, converters = self._row_converter(viewfields)
+        row = {names[key]: converters[key](value) for (key, value) in element.items() if key in names}
+        _drop_element(element)
+        return row
+
+    def _new_columns(self, viewfields):
+        """Empty ListColumns for viewfields"""
+        names, converters = self._row_converter(viewfields)
+        specs = []
+        for key in viewfields:
+            field_type = self._sp_cols[key]['type'] if key in self._sp_cols else None
+            if field_type in ('Number', 'Currency'):
+                kind = 'float'
+            elif field_type == 'DateTime':
+                kind = 'datetime'
+            elif field_type in ('Choice', 'User', 'UserMulti', 'Boolean'):
+                kind = 'dictionary'
+            else:
+                kind = 'object'
+            specs.append(('ows_' + key, names['ows_' + key], kind, converters['ows_' + key]))
+        return ListColumns(specs)
+
+    def _get_columns(self, viewname, fields, query, page_size):
+        """Page through the list into one ListColumns"""
+        columns = None
+        position = None
+        viewfields = None
+        while True:
+            soap_request, viewfields = self._build_list_items_request(viewname, fields, query, page_size, position, viewfields)
+            self.last_request = soap_request
+
+            # Send Request
+            response = self._session.post(url=self._url('Lists'),
+                                          headers=self._headers('GetListItems'),
+                                          data=soap_request.to_bytes(),
+                                          verify=self._verify_ssl,
+                                          timeout=self.timeout,
+                                          stream=True)
+
+            # Parse Response
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError('GetListItems request failed: %s' % response.status_code, response=response)
+            if columns is None:
+                columns = self._new_columns(viewfields)
+            rows = self._stream_list_items(response, viewfields, columns.append)
+            position = next(rows, None)
+            for row in rows:
+                pass
+
+            if not position:
+                return columns
+
+    def GetListItems(self, viewname=None, fields=None, query=None, rowlimit=0, debug=False, parallel=None,
+                     as_columns=False):
+        """Get Items from current list
+           rowlimit defaulted to 0 (unlimited)
+           parallel splits the list into that many ID ranges
+           and fetches them at the same time, see _splits
+           for when it is ignored
+           as_columns returns a ListColumns with one typed
+           array per column instead of a list of dicts
+        """
+        if parallel and parallel > 1 and not debug and self._splits(viewname, query, rowlimit):
+            return self._get_list_items_parallel(fields, query, parallel, as_columns)
+
+        soap_request, viewfields = self._build_list_items_request(viewname, fields, query, rowlimit)
+        self.last_request = soap_request
 
         # Send Request
+        # The body is only streamed when the response isn't handed back for debugging
         response = self._session.post(url=self._url('Lists'),
                                       headers=self._headers('GetListItems'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
-                                      timeout=self.timeout)
+                                      timeout=self.timeout,
+                                      stream=not debug)
 
         # Parse Response
         if response.status_code == 200:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            listitems = envelope[0][0][0][0][0]
-            data = []
-            for row in listitems:
-                # Strip the 'ows_' from the beginning with key[4:]
-                data.append({key[4:]: value for (key, value) in row.items() if key[4:] in viewfields})
-
-            self._convert_to_display(data)
-
             if debug:
+                _report(response)
                 return response
-            else:
-                return data
+            if as_columns:
+                columns = self._new_columns(viewfields)
+                for row in self._stream_list_items(response, viewfields, columns.append):
+                    pass
+                return columns
+            rows = self._stream_list_items(response, viewfields)
+            # Skip the next page position
+            next(rows, None)
+            return list(rows)
         else:
             return response
 
+    def _max_id(self):
+        """Highest item ID in the current list"""
+        rows = self.IterListItems(fields=['ID'], query={'OrderBy': [('ID', 'DESCENDING')]}, page_size=1)
+        for row in rows:
+            rows.close()
+            return int(row['ID'])
+        return 0
+
+    def _splits(self, viewname, query, rowlimit):
+        """Whether GetListItems can fetch the list in parallel ID ranges
+           Not with a rowlimit, one request returns those rows, a viewname,
+           the ranges' Where would replace the view's filter, or an
+           OrderBy, the ranges are joined in ID order.
+        """
+        if rowlimit or viewname:
+            return False
+        if isinstance(query, Query):
+            return query.order_by is None
+        return not (query and 'OrderBy' in query)
+
+    def _get_list_items_parallel(self, fields, query, parallel, as_columns=False):
+        """Split the ID space into ranges and fetch them concurrently
+           The ranges share the Session and are merged back in ID order
+        """
+        max_id = self._max_id()
+        if not max_id:
+            if as_columns:
+                return self._new_columns(self._build_list_items_request(None, fields, query)[1])
+            return []
+        fields, range_queries = self._range_queries(fields, query, max_id, parallel)
+
+        def fetch(range_query):
+            # 5000 is the default List View Threshold
+            if as_columns:
+                return self._get_columns(None, fields, range_query, 5000)
+            return list(self.IterListItems(None, fields, range_query, page_size=5000))
+
+        with ThreadPoolExecutor(max_workers=parallel) as executor:
+            pages = list(executor.map(fetch, range_queries))
+        return _merge_pages(pages, as_columns)
+
+    def _range_queries(self, fields, query, max_id, parallel):
+        """fields and one query per ID range for _get_list_items_parallel
+           IDs up to max_id are split into parallel ranges
+        """
+        step = max_id // parallel + 1
+        id_ranges = [(low, min(low + step - 1, max_id)) for low in range(1, max_id + 1, step)]
+
+        fields, query = self._split_query(fields, query)
+        query = dict(query or {})
+        where = query.get('Where')
+        # Sort each range by ID so concatenating them keeps the ID order
+        query['OrderBy'] = ['ID']
+        # Nest the caller's conditions under the ID range
+        return fields, [dict(query, Where=within_ids(where, low, high)) for low, high in id_ranges]
+
+    def IterListItems(self, viewname=None, fields=None, query=None, page_size=1000):
+        """Get Items from current list one page at a time
+           Yields the rows of each page as soon as it arrives
+           so only one page is held in memory
+           page_size defaulted to 1000 rows per request
+        """
+        position = None
+        viewfields = None
+        while True:
+            soap_request, viewfields = self._build_list_items_request(viewname, fields, query, page_size, position, viewfields)
+            self.last_request = soap_request
+
+            # Send Request
+            response = self._session.post(url=self._url('Lists'),
+                                          headers=self._headers('GetListItems'),
+                                          data=soap_request.to_bytes(),
+                                          verify=self._verify_ssl,
+                                          timeout=self.timeout,
+                                          stream=True)
+
+            # Parse Response
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError('GetListItems request failed: %s' % response.status_code, response=response)
+            rows = self._stream_list_items(response, viewfields)
+            position = next(rows, None)
+            for row in rows:
+                yield row
+
+            if not position:
+                break
+
+    def GetChanges(self, token=None, viewname=None, fields=None, query=None, page_size=1000):
+        """Get the Items that changed since token
+           Uses GetListItemChangesSinceToken
+           Without a token every item is returned as added.
+           Returns {'added': [rows], 'updated': [rows], 'deleted': [IDs], 'token': new token}
+           Save the token and pass it in next time.
+
+           SharePoint doesn't say if an item is new, so items
+           whose Created and Modified times match are counted as added.
+           Items without both times, like those of a view missing them,
+           are counted as updated.
+        """
+        changes = {'added': [], 'updated': [], 'deleted': [], 'token': token}
+        fields, query, extra = self._changes_fields(fields, query)
+        request_token = token
+        position = None
+        viewfields = None
+        while True:
+            soap_request, viewfields = self._build_list_items_request(viewname, fields, query, page_size, position,
+                                                                      viewfields, 'GetListItemChangesSinceToken')
+            rowfields = [key for key in viewfields if key not in extra]
+            if request_token:
+                soap_request.add_parameter('changeToken', request_token)
+            self.last_request = soap_request
+
+            # Send Request
+            response = self._session.post(url=self._url('Lists'),
+                                          headers=self._headers('GetListItemChangesSinceToken'),
+                                          data=soap_request.to_bytes(),
+                                          verify=self._verify_ssl,
+                                          timeout=self.timeout,
+                                          stream=True)
+
+            # Parse Response
+            if response.status_code != 200:
+                raise requests.exceptions.HTTPError('GetListItemChangesSinceToken request failed: %s' % response.status_code, response=response)
+            response.raw.decode_content = True
+            events = etree.iterparse(response.raw,
+                                     events=('start', 'end'),
+                                     tag=self._changes_tags,
+                                     huge_tree=self.huge_tree)
+            page = {'first': position is None, 'position': None, 'more': False}
+            timed = getattr(response, 'metrics', None) is not None
+            start = _timer() if timed else 0.0
+            convert_time = [0.0]
+
+            def pop_row(element):
+                if not timed:
+                    return self._pop_row(element, rowfields)
+                clock = _timer()
+                row = self._pop_row(element, rowfields)
+                convert_time[0] += _timer() - clock
+                return row
+
+            rows = 0
+            try:
+                rows = self._read_changes(events, changes, token, page, pop_row)
+            finally:
+                if timed:
+                    _report(response, parse_time=_timer() - start - convert_time[0], convert_time=convert_time[0],
+                            rows=rows)
+                response.close()
+
+            # Page through this token's items before asking for the next changes
+            position = page['position']
+            if not position:
+                if not page['more']:
+                    break
+                request_token = changes['token']
+
+        return changes
+
+    _changes_tags = ('{http://schemas.microsoft.com/sharepoint/soap/}Changes',
+                     '{urn:schemas-microsoft-com:rowset}data',
+                     '{#RowsetSchema}row')
+
+    def _changes_fields(self, fields, query):
+        """fields, query and the extra fields of GetChanges
+           Created and Modified are asked for too, they are dropped from the rows again
+        """
+        fields, query = self._split_query(fields, query)
+        extra = []
+        if fields:
+            fields = list(fields)
+            for name in ('Created', 'Modified'):
+                if name in self._sp_cols and self._sp_cols[name]['name'] not in fields:
+                    fields.append(self._sp_cols[name]['name'])
+                    extra.append(name)
+        return fields, query, extra
+
+    def _read_changes(self, events, changes, token, page, pop_row):
+        """Add the parse events of a GetListItemChangesSinceToken page to changes
+           page holds 'first', True for the first page of a token, and gets the
+           'position' of the next page and 'more', if there are more changes.
+           Returns the number of rows read.
+        """
+        rows = 0
+        for event, element in events:
+            if element.tag == '{http://schemas.microsoft.com/sharepoint/soap/}Changes':
+                if event == 'end':
+                    # Later pages of the same token can't lose changes made while paging
+                    if page['first']:
+                        changes['token'] = element.get('LastChangeToken', changes['token'])
+                    page['more'] = element.get('MoreChanges') == 'TRUE'
+                    for change in element.iterchildren('{http://schemas.microsoft.com/sharepoint/soap/}Id'):
+                        if change.get('ChangeType') in ('Delete', 'MoveAway'):
+                            changes['deleted'].append(change.text)
+            elif element.tag == '{urn:schemas-microsoft-com:rowset}data':
+                if event == 'start':
+                    page['position'] = element.get('ListItemCollectionPositionNext')
+            elif event == 'end':
+                created = element.get('ows_Created')
+                added = token is None or (created is not None and created == element.get('ows_Modified'))
+                rows += 1
+                changes['added' if added else 'updated'].append(pop_row(element))
+        return rows
+
     def GetList(self):
         """Get Info on Current List
-           This is run in __init__ so you don't
-           have to run it again.
-           Access from self.schema
+           This is run the first time the fields
+           are needed so you don't have to run it again.
+           Access from self.fields
         """
 
         # Build Request
         soap_request = soap('GetList')
         soap_request.add_parameter('listName', self.listName)
-        self.last_request = str(soap_request)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Lists'),
                                       headers=self._headers('GetList'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
         # Parse Response
         if response.status_code == 200:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            _list = envelope[0][0][0][0]
-            info = {key: value for (key, value) in _list.items()}
-            for row in _list[0].getchildren():
-                self.fields.append({key: value for (key, value) in row.items()})
+            envelope = _parse_response(response, self.huge_tree)
+            self._parse_list(envelope)
+
+        else:
+            raise Exception("ERROR:", response.status_code, response.text)
+
+    def _parse_list(self, envelope):
+        """Load the fields and settings from a GetList response"""
+        _list = envelope[0][0][0][0]
+        info = {key: value for (key, value) in _list.items()}
+        self._version = info.get('Version')
+        self.fields = []
+        for row in _list[0].getchildren():
+            self.fields.append({key: value for (key, value) in row.items()})
+        # Before hidden fields are filtered out
+        self._all_fields = list(self.fields)
+
+        self.regional_settings = {}
+        for setting in _list[1].getchildren():
+            self.regional_settings[
+                setting.tag.strip('{http://schemas.microsoft.com/sharepoint/soap/}')] = setting.text
 
-            for setting in _list[1].getchildren():
-                self.regional_settings[
-                    setting.tag.strip('{http://schemas.microsoft.com/sharepoint/soap/}')] = setting.text
+        self.server_settings = {}
+        for setting in _list[2].getchildren():
+            self.server_settings[
+                setting.tag.strip('{http://schemas.microsoft.com/sharepoint/soap/}')] = setting.text
 
-            for setting in _list[2].getchildren():
-                self.server_settings[
-                    setting.tag.strip('{http://schemas.microsoft.com/sharepoint/soap/}')] = setting.text
-            fields = envelope[0][0][0][0][0]
+        self._set_columns()
 
+    def _build_view_request(self, viewname):
+        """Build the GetView request
+           viewname must be a View Name, use GetView
+           to look up the default View
+        """
+        soap_request = soap('GetView')
+        soap_request.add_parameter('listName', self.listName)
+        if self.listName not in ['UserInfo', 'User Information List']:
+            soap_request.add_parameter('viewName', self.views[viewname]['Name'][1:-1])
         else:
-            raise Exception("ERROR:", response.status_code, response.text)
+            soap_request.add_parameter('viewName', viewname)
+        return soap_request
 
     def GetView(self, viewname):
         """Get Info on View Name
         """
 
-        # Build Request
-        soap_request = soap('GetView')
-        soap_request.add_parameter('listName', self.listName)
-
         if viewname == None:
             views = self.GetViewCollection()
             for view in views:
@@ -718,64 +2009,70 @@ class _List(object):
                         viewname = view
                         break
 
-        if self.listName not in ['UserInfo', 'User Information List']:
-            soap_request.add_parameter('viewName', self.views[viewname]['Name'][1:-1])
-        else:
-            soap_request.add_parameter('viewName', viewname)
-        self.last_request = str(soap_request)
+        # Build Request
+        soap_request = self._build_view_request(viewname)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Views'),
                                       headers=self._headers('GetView'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
         # Parse Response
         if response.status_code == 200:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            view = envelope[0][0][0][0]
-            info = {key: value for (key, value) in view.items()}
-            fields = [x.items()[0][1] for x in view[1]]
-            return {'info': info, 'fields': fields}
+            envelope = _parse_response(response, self.huge_tree)
+            return self._parse_view(envelope)
 
         else:
             raise Exception("ERROR:", response.status_code, response.text)
 
+    def _parse_view(self, envelope):
+        """Convert a GetView response"""
+        view = envelope[0][0][0][0]
+        info = {key: value for (key, value) in view.items()}
+        fields = [x.items()[0][1] for x in view[1]]
+        return {'info': info, 'fields': fields}
+
     def GetViewCollection(self):
         """Get Views for Current List
-           This is run in __init__ so you don't
-           have to run it again.
+           This is run the first time the views
+           are needed so you don't have to run it again.
            Access from self.views
         """
 
         # Build Request
         soap_request = soap('GetViewCollection')
         soap_request.add_parameter('listName', self.listName)
-        self.last_request = str(soap_request)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Views'),
                                       headers=self._headers('GetViewCollection'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
         # Parse Response
         if response.status_code == 200:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            views = envelope[0][0][0][0]
-            data = []
-            for row in views.getchildren():
-                data.append({key: value for (key, value) in row.items()})
-            view = {}
-            for row in data:
-                view[row['DisplayName']] = row
-            return view
+            envelope = _parse_response(response, self.huge_tree)
+            return self._parse_view_collection(envelope)
 
         else:
             return ("ERROR", response.status_code)
 
+    def _parse_view_collection(self, envelope):
+        """Convert a GetViewCollection response to a dict keyed by View Name"""
+        views = envelope[0][0][0][0]
+        data = []
+        for row in views.getchildren():
+            data.append({key: value for (key, value) in row.items()})
+        view = {}
+        for row in data:
+            view[row['DisplayName']] = row
+        return view
+
     def UpdateList(self, listName, data, listVersion):
         ### Todo: Complete this one
 
@@ -787,18 +2084,18 @@ class _List(object):
         soap_request.add_parameter('updateFields', templateID)
         soap_request.add_parameter('deleteFields', templateID)
         soap_request.add_parameter('listVersion', templateID)
-        self.last_request = str(soap_request)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Lists'),
                                       headers=self._headers('AddList'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
         pass
 
-    def UpdateListItems(self, data, kind):
+    def UpdateListItems(self, data, kind, chunk_size=500, threads=1):
         """Update List Items
            kind = 'New', 'Update', or 'Delete'
 
@@ -814,38 +2111,196 @@ class _List(object):
            Delete:
            Just provied a list of ID's
                data = [23, 28]
+
+           Rows are sent in batches of chunk_size and up to
+           threads batches are sent at the same time.
+           Method IDs are numbered across all batches so every
+           result can be traced back to its row in data.
         """
         if type(data) != list:
             raise Exception('data must be a list of dictionaries')
-        # Build Request
-        soap_request = soap('UpdateListItems')
-        soap_request.add_parameter('listName', self.listName)
         if kind != 'Delete':
             self._convert_to_internal(data)
-        soap_request.add_actions(data, kind)
-        self.last_request = str(soap_request)
+
+        chunks = _update_chunks(data, chunk_size)
+
+        def send(chunk):
+            start, rows = chunk
+            return self._update_list_items_batch(rows, kind, start + 1)
+
+        if threads and threads > 1 and len(chunks) > 1:
+            with ThreadPoolExecutor(max_workers=threads) as executor:
+                responses = list(executor.map(send, chunks))
+        else:
+            responses = [send(chunk) for chunk in chunks]
+
+        # A single batch behaves like it always has
+        if len(chunks) == 1:
+            return responses[0]
+
+        data = {}
+        for (start, rows), response in zip(chunks, responses):
+            if isinstance(response, dict):
+                data.update(response)
+            else:
+                # The whole batch failed, report it against each of its rows
+                for index in range(start + 1, start + len(rows) + 1):
+                    data['%s,%s' % (index, kind)] = (str(response.status_code), response.reason)
+        return data
+
+    def _update_list_items_batch(self, rows, kind, start):
+        """Send one UpdateListItems Batch
+           Methods are numbered from start
+        """
+        # Build Request
+        soap_request = self._build_update_request(rows, kind, start)
+        return self._send_update(soap_request)
+
+    def _send_update(self, soap_request):
+        """Send an UpdateListItems request, returns the results or the failed response"""
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Lists'),
                                       headers=self._headers('UpdateListItems'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=self._verify_ssl,
                                       timeout=self.timeout)
 
         # Parse Response
         if response.status_code == 200:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            results = envelope[0][0][0][0]
-            data = {}
-            for result in results:
-                if result.text != '0x00000000' and result[0].text != '0x00000000':
-                    data[result.attrib['ID']] = (result[0].text, result[1].text)
-                else:
-                    data[result.attrib['ID']] = result[0].text
-            return data
+            envelope = _parse_response(response, self.huge_tree)
+            return self._parse_update_results(envelope)
         else:
             return response
 
+    def BulkInsert(self, data, chunk_size=500, threads=1):
+        """Add new List Items
+           Does the same as UpdateListItems(data, 'New') with much less work per row:
+           columns are looked up once per call and the requests are written
+           straight to bytes and sent as soon as chunk_size rows are in.
+
+           data can be any iterable of dicts like a generator or csv.DictReader,
+               data = ({'Title': title, 'Amount': amount} for title, amount in source)
+           or columns, as a ListColumns or a dict of lists.
+               data = {'Title': ['First', 'Second'], 'Amount': [1.5, 2]}
+
+           Empty values (None or NaN) are left out of the new item.
+           Up to threads requests are sent at the same time.
+           Returns {'Method ID': result} like UpdateListItems with several batches.
+        """
+        chunk_size = int(chunk_size) if chunk_size else 500
+        threads = max(int(threads or 1), 1)
+        encode_row = self._row_encoder()
+        rows = _bulk_rows(data)
+
+        results = {}
+
+        def send(request):
+            return request, self._send_update(request)
+
+        def collect(future):
+            request, response = future.result()
+            if isinstance(response, dict):
+                results.update(response)
+            else:
+                # The whole batch failed, report it against each of its rows
+                for index in range(request.start, request.start + request.count):
+                    results['%s,New' % index] = (str(response.status_code), response.reason)
+
+        # The next batch is written while the previous ones are being sent
+        with ThreadPoolExecutor(max_workers=threads) as executor:
+            pending = set()
+            for request in self._bulk_requests(rows, encode_row, chunk_size):
+                if len(pending) >= threads:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        collect(future)
+                pending.add(executor.submit(send, request))
+            for future in pending:
+                collect(future)
+        return results
+
+    def _bulk_requests(self, rows, encode_row, chunk_size, start=1):
+        """Yield a _BulkRequest every chunk_size rows, Method IDs are numbered from start"""
+        request = None
+        for index, row in enumerate(rows, start):
+            if request is None:
+                request = _BulkRequest(self.listName, index)
+            request.add(index, encode_row(row))
+            if request.count >= chunk_size:
+                yield request
+                request = None
+        if request is not None:
+            yield request
+
+    def _row_encoder(self):
+        """Function turning a row's (column, value) pairs into Field elements
+           Each column is looked up the first time it is seen.
+        """
+        fields = {}
+
+        def field(key):
+            if key not in self._disp_cols:
+                raise Exception(key + ' not a column in current List.')
+            column = self._disp_cols[key]
+            fields[key] = ('<Field Name="%s">' % _escape_text(column['name']), self._field_encoder(column['type']))
+            return fields[key]
+
+        def encode_row(pairs):
+            parts = []
+            for key, value in pairs:
+                # None and NaN
+                if value is None or value != value:
+                    continue
+                prefix, encode = fields.get(key) or field(key)
+                parts.append(prefix)
+                parts.append(encode(value))
+                parts.append('</Field>')
+            return ''.join(parts)
+        return encode_row
+
+    def _field_encoder(self, field_type):
+        """Function turning a value into the escaped text of a field, like _sp_type"""
+        if field_type == 'DateTime':
+            def encode(value):
+                if hasattr(value, 'strftime'):
+                    return value.strftime('%Y-%m-%d %H:%M:%S')
+                return _escape_text(value)
+        elif field_type == 'Boolean':
+            def encode(value):
+                if value == 'Yes':
+                    return '1'
+                elif value == 'No':
+                    return '0'
+                raise Exception("%s not a valid Boolean Value, only 'Yes' or 'No'" % value)
+        elif field_type == 'User':
+            users = self.users['py']
+
+            def encode(value):
+                return _escape_text(users[value])
+        else:
+            encode = _escape_text
+        return encode
+
+    def _build_update_request(self, rows, kind, start=1):
+        """Build an UpdateListItems request for rows already converted to internal names"""
+        soap_request = soap('UpdateListItems')
+        soap_request.add_parameter('listName', self.listName)
+        soap_request.add_actions(rows, kind, start)
+        return soap_request
+
+    def _parse_update_results(self, envelope):
+        """Convert an UpdateListItems response to a dict keyed by Method ID"""
+        results = envelope[0][0][0][0]
+        data = {}
+        for result in results:
+            if result.text != '0x00000000' and result[0].text != '0x00000000':
+                data[result.attrib['ID']] = (result[0].text, result[1].text)
+            else:
+                data[result.attrib['ID']] = result[0].text
+        return data
+
     def GetAttachmentCollection(self, _id):
         """Get Attachments for given List Item ID"""
 
@@ -853,65 +2308,80 @@ class _List(object):
         soap_request = soap('GetAttachmentCollection')
         soap_request.add_parameter('listName', self.listName)
         soap_request.add_parameter('listItemID', _id)
-        self.last_request = str(soap_request)
+        self.last_request = soap_request
 
         # Send Request
         response = self._session.post(url=self._url('Lists'),
                                       headers=self._headers('GetAttachmentCollection'),
-                                      data=str(soap_request),
+                                      data=soap_request.to_bytes(),
                                       verify=False,
                                       timeout=self.timeout)
 
         # Parse Request
         if response.status_code == 200:
-            envelope = etree.fromstring(response.text.encode('utf-8'), parser=etree.XMLParser(huge_tree=self.huge_tree))
-            attaches = envelope[0][0][0][0]
-            attachments = []
-            for attachment in attaches.getchildren():
-                attachments.append(attachment.text)
-            return attachments
+            envelope = _parse_response(response, self.huge_tree)
+            return self._parse_attachments(envelope)
         else:
             return response
 
+    def _parse_attachments(self, envelope):
+        """Convert a GetAttachmentCollection response to a list of urls"""
+        attaches = envelope[0][0][0][0]
+        attachments = []
+        for attachment in attaches.getchildren():
+            attachments.append(attachment.text)
+        return attachments
+
 
 class soap(object):
-    """A simple class for building SAOP Requests"""
+    """A simple class for building SAOP Requests
+       Only the command element is built with lxml, the Envelope
+       around it is the same for every request and kept as bytes.
+    """
+
+    # HEADER GLOBALS
+    SOAPENV_NAMESPACE = "http://schemas.xmlsoap.org/soap/envelope/"
+    ns1_NAMESPACE = "http://schemas.microsoft.com/sharepoint/soap/"
+    xsi_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
+
+    start_str = b"""<?xml version="1.0" encoding="utf-8"?>"""
+    envelope_start = (start_str +
+                      b'<SOAP-ENV:Envelope xmlns:SOAP-ENV="' + SOAPENV_NAMESPACE.encode('ascii') +
+                      b'" xmlns:ns0="' + SOAPENV_NAMESPACE.encode('ascii') +
+                      b'" xmlns:ns1="' + ns1_NAMESPACE.encode('ascii') +
+                      b'" xmlns:xsi="' + xsi_NAMESPACE.encode('ascii') +
+                      b'"><SOAP-ENV:Header/><SOAP-ENV:Body>')
+    envelope_end = b'</SOAP-ENV:Body></SOAP-ENV:Envelope>'
 
     def __init__(self, command):
-        self.envelope = None
-        self.command = command
-        self.request = None
         self.updates = None
         self.batch = None
-
-        # HEADER GLOBALS
-        SOAPENV_NAMESPACE = "http://schemas.xmlsoap.org/soap/envelope/"
-        SOAPENV = "{%s}" % SOAPENV_NAMESPACE
-        ns0_NAMESPACE = "http://schemas.xmlsoap.org/soap/envelope/"
-        ns0 = "{%s}" % ns0_NAMESPACE
-        ns1_NAMESPACE = "http://schemas.microsoft.com/sharepoint/soap/"
-        ns1 = "{%s}" % ns1_NAMESPACE
-        xsi_NAMESPACE = "http://www.w3.org/2001/XMLSchema-instance"
-        xsi = "{%s}" % xsi_NAMESPACE
-        NSMAP = {'SOAP-ENV': SOAPENV_NAMESPACE, 'ns0': ns0_NAMESPACE, 'ns1': ns1_NAMESPACE, 'xsi': xsi_NAMESPACE}
-
-        # Create Header
-        self.envelope = etree.Element(SOAPENV + "Envelope", nsmap=NSMAP)
-        header = etree.SubElement(self.envelope, SOAPENV + "Header", nsmap=NSMAP)
-        HEADER = etree.SubElement(self.envelope, '{http://schemas.xmlsoap.org/soap/envelope/}Body')
+        self._bytes = None
 
         # Create Command
-        self.command = etree.SubElement(HEADER, '{http://schemas.microsoft.com/sharepoint/soap/}' + command)
+        self.command = etree.Element('{http://schemas.microsoft.com/sharepoint/soap/}' + command,
+                                     nsmap={'ns1': self.ns1_NAMESPACE})
+
+    def to_bytes(self):
+        """The request body, serialized once"""
+        if self._bytes is None:
+            self._bytes = self.envelope_start + etree.tostring(self.command) + self.envelope_end
+        return self._bytes
 
-        self.start_str = b"""<?xml version="1.0" encoding="utf-8"?>"""
+    @property
+    def envelope(self):
+        """The whole request as an lxml tree"""
+        return etree.fromstring(self.to_bytes())
 
     def add_parameter(self, parameter, value=None):
+        self._bytes = None
         sub = etree.SubElement(self.command, '{http://schemas.microsoft.com/sharepoint/soap/}' + parameter)
         if value:
             sub.text = value
 
     # UpdateListItems Method
-    def add_actions(self, data, kind):
+    def add_actions(self, data, kind, start=1):
+        self._bytes = None
         if not self.updates:
             updates = etree.SubElement(self.command, '{http://schemas.microsoft.com/sharepoint/soap/}updates')
             self.batch = etree.SubElement(updates, 'Batch')
@@ -919,7 +2389,7 @@ class soap(object):
             self.batch.set('ListVersion', '1')
 
         if kind == 'Delete':
-            for index, _id in enumerate(data, 1):
+            for index, _id in enumerate(data, start):
                 method = etree.SubElement(self.batch, 'Method')
                 method.set('ID', str(index))
                 method.set('Cmd', kind)
@@ -928,7 +2398,7 @@ class soap(object):
                 field.text = str(_id)
 
         else:
-            for index, row in enumerate(data, 1):
+            for index, row in enumerate(data, start):
                 method = etree.SubElement(self.batch, 'Method')
                 method.set('ID', str(index))
                 method.set('Cmd', kind)
@@ -939,6 +2409,7 @@ class soap(object):
 
     # GetListFields Method
     def add_view_fields(self, fields):
+        self._bytes = None
         viewFields = etree.SubElement(self.command, '{http://schemas.microsoft.com/sharepoint/soap/}viewFields')
         viewFields.set('ViewFieldsOnly', 'true')
         ViewFields = etree.SubElement(viewFields, 'ViewFields')
@@ -948,6 +2419,7 @@ class soap(object):
 
     # GetListItems Method
     def add_query(self, pyquery):
+        self._bytes = None
         query = etree.SubElement(self.command, '{http://schemas.microsoft.com/sharepoint/soap/}query')
         Query = etree.SubElement(query, 'Query')
         if 'OrderBy' in pyquery:
@@ -970,8 +2442,58 @@ class soap(object):
         if 'Where' in pyquery:
             Query.append(pyquery['Where'])
 
+    # GetListItems Method
+    def add_query_options(self, pyoptions):
+        self._bytes = None
+        queryOptions = etree.SubElement(self.command, '{http://schemas.microsoft.com/sharepoint/soap/}queryOptions')
+        QueryOptions = etree.SubElement(queryOptions, 'QueryOptions')
+        for option, value in pyoptions.items():
+            element = etree.SubElement(QueryOptions, option)
+            if type(value) == dict:
+                for key, attribute in value.items():
+                    element.set(key, attribute)
+            else:
+                element.text = value
+
     def __repr__(self):
-        return (self.start_str + etree.tostring(self.envelope)).decode('utf-8')
+        return self.to_bytes().decode('utf-8')
 
     def __str__(self, pretty_print=False):
         return (self.start_str + etree.tostring(self.envelope, pretty_print=True)).decode('utf-8')
+
+
+class _BulkRequest(object):
+    """UpdateListItems request for new items, written straight to bytes
+       Used in place of a soap object by _List.BulkInsert.
+    """
+
+    def __init__(self, list_name, start):
+        self.start = start
+        self.count = 0
+        self._bytes = None
+        self._buffer = bytearray(soap.envelope_start)
+        self._buffer += ('<ns1:UpdateListItems><ns1:listName>%s</ns1:listName><ns1:updates>'
+                         '<Batch OnError="Return" ListVersion="1">' % _escape_text(list_name)).encode('utf-8')
+
+    def add(self, index, fields):
+        """Add a Method from the text of its Field elements"""
+        self._buffer += ('<Method ID="%d" Cmd="New">%s</Method>' % (index, fields)).encode('utf-8')
+        self.count += 1
+
+    def to_bytes(self):
+        """The request body, the request is finished once this is called"""
+        if self._bytes is None:
+            self._buffer += b'</Batch></ns1:updates></ns1:UpdateListItems>' + soap.envelope_end
+            self._bytes = bytes(self._buffer)
+            self._buffer = None
+        return self._bytes
+
+    @property
+    def envelope(self):
+        return etree.fromstring(self.to_bytes())
+
+    def __repr__(self):
+        return self.to_bytes().decode('utf-8')
+
+    def __str__(self):
+        return (soap.start_str + etree.tostring(self.envelope, pretty_print=True)).decode('utf-8')
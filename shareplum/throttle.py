@@ -0,0 +1,168 @@
+# Throttling
+# SharePoint Online answers heavy clients with 429 or 503
+# and a Retry-After header.  Every request of a Site goes
+# through ThrottledSession, which waits and tries again and
+# slows the whole Site down while the server is pushing back.
+
+import random
+import threading
+import time
+from email.utils import parsedate_tz, mktime_tz
+
+import requests
+
+from .metrics import RequestMetrics, request_action, timer
+
+# Statuses SharePoint uses to throttle
+THROTTLE_STATUS = (429, 503)
+
+
+class RateLimiter(object):
+    """Spaces out requests, slowing down when throttled and speeding back up after
+
+       Starts at max_rate requests per second, or unlimited when None.  Each throttled
+       response halves the rate and pauses every request until Retry-After has passed,
+       each successful one raises it by 10% again.
+    """
+
+    def __init__(self, max_rate=None, min_rate=1.0, recovery=0.1):
+        self.min_interval = 1.0 / max_rate if max_rate else 0.0
+        self.max_interval = 1.0 / min_rate
+        self.recovery = recovery
+        self.interval = self.min_interval
+        self._next = 0.0
+        self._paused_until = 0.0
+        self._lock = threading.Lock()
+
+    @property
+    def rate(self):
+        """Current requests per second, None when unlimited"""
+        return 1.0 / self.interval if self.interval else None
+
+    def reserve(self):
+        """Take the next slot, returns the seconds to wait for it"""
+        with self._lock:
+            now = time.time()
+            start = max(now, self._next, self._paused_until)
+            self._next = start + self.interval
+            return start - now
+
+    def throttled(self, delay):
+        """The server asked to wait delay seconds"""
+        with self._lock:
+            now = time.time()
+            # Requests already sent before the pause don't slow down any further
+            if now >= self._paused_until:
+                # Unlimited starts again from 10 requests a second
+                self.interval = min(max(self.interval * 2, 0.1), self.max_interval)
+            self._paused_until = max(self._paused_until, now + delay)
+
+    def succeeded(self):
+        with self._lock:
+            if self.interval > self.min_interval:
+                self.interval = max(self.interval * (1 - self.recovery), self.min_interval)
+                if self.interval < 0.001:
+                    self.interval = self.min_interval
+
+
+class ThrottleStats(object):
+    """Counters of a ThrottledSession"""
+
+    def __init__(self):
+        self.requests = 0
+        self.throttled = 0
+        self.retries = 0
+        self.waited = 0.0
+        self._lock = threading.Lock()
+
+    def add(self, **counts):
+        with self._lock:
+            for name, count in counts.items():
+                setattr(self, name, getattr(self, name) + count)
+
+    def as_dict(self):
+        return {'requests': self.requests, 'throttled': self.throttled,
+                'retries': self.retries, 'waited': self.waited}
+
+
+def retry_delay(headers, attempt, backoff=1.0, max_backoff=60.0):
+    """Seconds to wait before trying again
+
+       Retry-After when the server sent one, in seconds or as a date,
+       otherwise exponential backoff with full jitter.
+    """
+    retry_after = headers.get('Retry-After')
+    if retry_after:
+        try:
+            return max(float(retry_after), 0.0)
+        except ValueError:
+            date = parsedate_tz(retry_after)
+            if date is not None:
+                return max(mktime_tz(date) - time.time(), 0.0)
+    return random.uniform(0, min(max_backoff, backoff * 2 ** attempt))
+
+
+class ThrottledSession(requests.Session):
+    """requests Session that retries throttled requests
+
+       429 and 503 responses are tried again up to retries times, after Retry-After
+       or an exponential backoff, and slow down every request sent through the
+       session.  The last response is returned if the server keeps throttling.
+
+       While metric_hooks isn't empty every response gets a RequestMetrics
+       as response.metrics.  Responses other than 200 are reported straight
+       away, the caller reports the others once it has read the body.
+    """
+
+    def __init__(self, retries=5, backoff=1.0, max_backoff=60.0, max_rate=None, metric_hooks=None):
+        requests.Session.__init__(self)
+        self.retries = retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.limiter = RateLimiter(max_rate)
+        self.stats = ThrottleStats()
+        self.metric_hooks = [] if metric_hooks is None else metric_hooks
+
+    def request(self, method, url, *args, **kwargs):
+        if not self.metric_hooks:
+            response, attempt = self._request(method, url, *args, **kwargs)
+            return response
+
+        start = timer()
+        response, attempt = self._request(method, url, *args, **kwargs)
+        metrics = RequestMetrics(list(self.metric_hooks), request_action(url, kwargs.get('headers')),
+                                 method, url)
+        metrics.status = response.status_code
+        metrics.retries = attempt
+        metrics.server_time = response.elapsed.total_seconds()
+        body = response.request.body
+        metrics.bytes_sent = len(body) if hasattr(body, '__len__') else 0
+        if not kwargs.get('stream'):
+            metrics.bytes_received = len(response.content)
+        metrics.total_time = timer() - start
+        response.metrics = metrics
+        if response.status_code != 200:
+            metrics.emit()
+        return response
+
+    def _request(self, method, url, *args, **kwargs):
+        """Send until the server stops throttling, returns the response and the retries"""
+        attempt = 0
+        while True:
+            wait = self.limiter.reserve()
+            if wait > 0:
+                time.sleep(wait)
+            response = requests.Session.request(self, method, url, *args, **kwargs)
+            self.stats.add(requests=1, waited=wait)
+            if response.status_code not in THROTTLE_STATUS:
+                self.limiter.succeeded()
+                return response, attempt
+
+            self.stats.add(throttled=1)
+            delay = retry_delay(response.headers, attempt, self.backoff, self.max_backoff)
+            self.limiter.throttled(delay)
+            if attempt >= self.retries:
+                return response, attempt
+            response.close()
+            attempt += 1
+            self.stats.add(retries=1)
@@ -0,0 +1,471 @@
+# Regression tests run against benchmarks/fake_server.py
+#
+#   python -m pytest tests
+#
+# Python 3 only, like the fake server.
+
+import io
+import os
+import shutil
+import sys
+import tempfile
+import time
+import unittest
+
+import requests
+from lxml import etree
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks'))
+
+from fake_server import FakeSharePoint, serve  # noqa: E402
+from shareplum import Office365, SchemaCache, Site  # noqa: E402
+from shareplum.shareplum import soap  # noqa: E402
+from shareplum.ListDict import reconcile  # noqa: E402
+from shareplum.caml import IN_LIMIT, Field, Query  # noqa: E402
+from shareplum.export import ExportJob, Exporter, JsonLinesSink  # noqa: E402
+
+try:
+    import asyncio
+    from shareplum.aio import AsyncSite, aiohttp
+except ImportError:
+    aiohttp = None
+
+
+class FakeServerTestCase(unittest.TestCase):
+    rows = 60
+
+    @classmethod
+    def setUpClass(cls):
+        cls.sharepoint = FakeSharePoint(rows=cls.rows, width=10, files=4, file_size=1000)
+        cls.server, cls.url = serve(cls.sharepoint)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        self.site = Site(self.url)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def keep_files(self):
+        """Put the server's files back as they are now once the test is done"""
+        files = dict(self.sharepoint.files)
+
+        def restore():
+            self.sharepoint.files.clear()
+            self.sharepoint.files.update(files)
+        self.addCleanup(restore)
+
+
+class TestSite(FakeServerTestCase):
+
+    def test_list_collection(self):
+        lists = self.site.GetListCollection()
+        self.assertEqual([sp_list['Title'] for sp_list in lists], ['Bench'])
+
+    def test_schema_cache(self):
+        self.addCleanup(setattr, self.sharepoint, 'version', 1)
+        path = os.path.join(self.directory, 'schema.db')
+
+        def actions(ttl):
+            metrics = []
+            site = Site(self.url, metric_hooks=[metrics.append], schema_cache=SchemaCache(path, ttl=ttl))
+            rows = site.List('Bench').GetListItems(fields=['ID', 'Col1 Number'], rowlimit=2)
+            self.assertEqual(rows[0]['Col1 Number'], 1.25)
+            return [m.action for m in metrics]
+        self.assertEqual(actions(3600), ['GetList', 'GetViewCollection', 'GetListItems'])
+        self.assertEqual(actions(3600), ['GetListItems'])
+        # Stale, but the List's Version is the same
+        self.assertEqual(actions(0), ['GetListCollection', 'GetListItems'])
+        self.sharepoint.version = 2
+        self.assertEqual(actions(0), ['GetListCollection', 'GetList', 'GetViewCollection', 'GetListItems'])
+        self.assertEqual(actions(3600), ['GetListItems'])
+
+    def test_throttled(self):
+        self.addCleanup(setattr, self.sharepoint, 'throttle', 0)
+        self.sharepoint.throttle = 2
+        self.assertEqual(len(self.site.GetListCollection()), 1)
+        stats = self.site.throttle_stats
+        self.assertEqual((stats['requests'], stats['throttled'], stats['retries']), (3, 2, 2))
+        self.assertTrue(stats['rate'])
+
+    def test_throttled_too_often(self):
+        self.addCleanup(setattr, self.sharepoint, 'throttle', 0)
+        self.sharepoint.throttle = 3
+        response = Site(self.url, throttle_retries=1).GetListCollection()
+        self.assertEqual(response.status_code, 429)
+
+    def test_metrics(self):
+        self.addCleanup(setattr, self.sharepoint, 'throttle', 0)
+        metrics = []
+        site = Site(self.url, metric_hooks=[metrics.append])
+        sp_list = site.List('Bench')
+        self.sharepoint.throttle = 1
+        sp_list.GetListItems(fields=['ID'], rowlimit=5)
+        self.assertEqual([(m.action, m.status, m.retries) for m in metrics],
+                         [('GetList', 200, 1), ('GetListItems', 200, 0)])
+        self.assertEqual(metrics[1].rows, 5)
+        self.assertTrue(metrics[1].bytes_sent and metrics[1].bytes_received)
+        site.RemoveMetricsHook(metrics.append)
+        sp_list.GetListItems(fields=['ID'], rowlimit=5)
+        self.assertEqual(len(metrics), 2)
+
+    def test_broken_metrics_hook(self):
+        def broken(metrics):
+            raise ValueError(metrics)
+        site = Site(self.url)
+        site.AddMetricsHook(broken)
+        with self.assertLogs('shareplum.metrics', 'ERROR'):
+            self.assertEqual(len(site.GetListCollection()), 1)
+
+
+class TestList(FakeServerTestCase):
+
+    def test_view_without_fields(self):
+        # Only the views are loaded here, the converters must load the fields
+        rows = self.site.List('Bench').GetListItems('All Items', rowlimit=20)
+        self.assertEqual(len(rows), 20)
+        self.assertEqual(rows[0]['Col1 Number'], 1.25)
+
+    def test_python_type_first(self):
+        sp_list = self.site.List('Bench')
+        self.assertEqual(sp_list._python_type('Col1_x0020_Number', '2.5'), 2.5)
+
+    def test_iter_view(self):
+        rows = list(self.site.List('Bench').IterListItems('All Items', page_size=25))
+        self.assertEqual([row['ID'] for row in rows], [str(i) for i in range(1, self.rows + 1)])
+
+    def test_fields(self):
+        rows = self.site.List('Bench').GetListItems(fields=['ID', 'Title'], rowlimit=3)
+        self.assertEqual(rows, [{'ID': str(i), 'Title': 'Item %d' % i} for i in range(1, 4)])
+
+    def test_parallel(self):
+        rows = self.site.List('Bench').GetListItems(parallel=4)
+        self.assertEqual([row['ID'] for row in rows], [str(i) for i in range(1, self.rows + 1)])
+
+    def test_parallel_rowlimit(self):
+        sp_list = self.site.List('Bench')
+        rows = sp_list.GetListItems(parallel=4, rowlimit=7)
+        self.assertEqual([row['ID'] for row in rows], [str(i) for i in range(1, 8)])
+        self.assertIn('rowLimit>7<', sp_list.last_request)
+
+    def test_parallel_order_by(self):
+        query = Query(Field('ID') > 50, order_by=[('ID', 'DESCENDING')])
+        rows = self.site.List('Bench').GetListItems(fields=['ID'], query=query, parallel=4)
+        self.assertEqual([row['ID'] for row in rows], [str(i) for i in range(self.rows, 50, -1)])
+        rows = self.site.List('Bench').GetListItems(fields=['ID'], query={'OrderBy': [('ID', 'DESCENDING')]},
+                                                    parallel=4)
+        self.assertEqual(rows[0]['ID'], str(self.rows))
+
+    def test_parallel_view(self):
+        sp_list = self.site.List('Bench')
+        rows = sp_list.GetListItems('All Items', parallel=4)
+        self.assertEqual(len(rows), self.rows)
+        self.assertNotIn('Geq', sp_list.last_request)
+
+    def test_as_columns_view(self):
+        columns = self.site.List('Bench').GetListItems('All Items', as_columns=True)
+        self.assertEqual(len(columns), self.rows)
+
+    def test_changes(self):
+        changes = self.site.List('Bench').GetChanges()
+        self.assertEqual(len(changes['added']), self.rows)
+        self.assertTrue(changes['token'])
+
+    def test_update(self):
+        results = self.site.List('Bench').UpdateListItems([{'Title': 'a'}, {'Title': 'b'}], 'New')
+        self.assertEqual(sorted(results), ['1,New', '2,New'])
+
+    def test_bulk_insert(self):
+        sp_list = self.site.List('Bench')
+        sent = []
+        send_update = sp_list._send_update
+
+        def track(request):
+            sent.append(request.to_bytes())
+            return send_update(request)
+        sp_list._send_update = track
+        results = sp_list.BulkInsert({'Title': ['a', 'b', None], 'Col1 Number': [1.5, None, 3]},
+                                     chunk_size=2, threads=2)
+        self.assertEqual(results, {'1,New': '0x00000000', '2,New': '0x00000000', '3,New': '0x00000000'})
+        self.assertEqual(len(sent), 2)
+        self.assertIn(b'<Method ID="2" Cmd="New"><Field Name="Title">b</Field></Method>', sent[0])
+        self.assertIn(b'<Method ID="3" Cmd="New"><Field Name="Col1_x0020_Number">3</Field></Method>', sent[1])
+
+    def test_caml_query(self):
+        sp_list = self.site.List('Bench')
+        query = Query(where=(Field('ID') > 10) & (Field('ID') <= 15) & (Field('Col1 Number') > 1), select=['Title'])
+        rows = sp_list.GetListItems(query=query)
+        self.assertEqual(rows, [{'Title': 'Item %d' % i} for i in range(11, 16)])
+        where = etree.fromstring(sp_list.last_request.encode('utf-8')).find('.//Where')
+        # Every And has two children, the column is sent by its internal name
+        self.assertEqual([len(element) for element in where.iter('And')], [2, 2])
+        self.assertEqual(where.find('.//Gt/FieldRef[@Name="Col1_x0020_Number"]/../Value').get('Type'), 'Number')
+
+    def test_caml_in(self):
+        element = Field('Title').In(['Item %d' % i for i in range(IN_LIMIT + 1)]).element(self.site.List('Bench'))
+        self.assertEqual(element.tag, 'Or')
+        self.assertEqual([len(child.find('Values')) for child in element], [IN_LIMIT, 1])
+
+
+class TestEmptyList(FakeServerTestCase):
+    rows = 0
+
+    def test_parallel_columns(self):
+        columns = self.site.List('Bench').GetListItems(fields=['ID', 'Title'], parallel=4, as_columns=True)
+        self.assertEqual(len(columns), 0)
+        self.assertEqual(columns.names, ['ID', 'Title'])
+
+
+class TestDocuments(FakeServerTestCase):
+
+    def test_download_tree(self):
+        documents = self.site.Documents('Shared Documents')
+        documents.GetAllFilesInFolder(self.directory, include_sub_folders=True)
+        downloaded = []
+        for root, folders, files in os.walk(self.directory):
+            downloaded.extend(files)
+        self.assertEqual(sorted(downloaded), ['file%d.bin' % i for i in range(4)])
+
+    def test_sync(self):
+        documents = self.site.Documents('Shared Documents')
+        first = documents.Sync(self.directory)
+        self.assertEqual(len(first['downloaded']), 4)
+        self.keep_files()
+        del self.sharepoint.files['Shared Documents/file0.bin']
+        self.sharepoint.files['Shared Documents/Folder 1/file2.bin'] = 500
+        second = documents.Sync(self.directory)
+        self.assertEqual(second['downloaded'], ['Shared Documents/Folder 1/file2.bin'])
+        self.assertEqual(second['deleted'], ['Shared Documents/file0.bin'])
+        self.assertEqual((len(second['unchanged']), second['failed']), (2, []))
+        self.assertFalse(os.path.exists(os.path.join(self.directory, 'file0.bin')))
+        self.assertEqual(os.path.getsize(os.path.join(self.directory, 'Folder 1', 'file2.bin')), 500)
+
+    def test_chunked_upload(self):
+        self.keep_files()
+        documents = self.site.Documents('Shared Documents')
+        path = os.path.join(self.directory, 'upload.bin')
+        for size, offsets in ((25, [10, 20, 25]), (20, [10, 20])):
+            with open(path, 'wb') as f:
+                f.write(b'x' * size)
+            progress = []
+            url = documents.UploadFile(path, chunk_size=10, progress=lambda name, done: progress.append(done))
+            self.assertEqual(url, 'Shared Documents/upload.bin')
+            self.assertEqual(progress, offsets)
+            self.assertEqual(self.sharepoint.files[url], size)
+        self.assertEqual(self.sharepoint.uploads, {})
+
+    def test_download_closes_response(self):
+        documents = self.site.Documents('Shared Documents')
+        # A file where the directory should be, so the part file can't be made
+        target = os.path.join(self.directory, 'file')
+        open(target, 'w').close()
+        responses = []
+        get = self.site._session.get
+
+        def track(*args, **kwargs):
+            responses.append(get(*args, **kwargs))
+            return responses[-1]
+        documents._session.get = track
+        self.assertRaises(OSError, documents.GetFileByRelativeUrl,
+                          'Shared Documents/file0.bin', 'file0.bin', target)
+        self.assertTrue(responses[0].raw.closed)
+
+    def test_request_digest(self):
+        digests = self.sharepoint.digests
+        self.keep_files()
+        documents = self.site.Documents('Shared Documents')
+        self.site.Documents('Shared Documents').UploadFile(io.BytesIO(b'data'), 'one.txt')
+        self.assertEqual(self.sharepoint.digests, digests + 1)
+        self.sharepoint.expire_digest()
+        documents.UploadFile(io.BytesIO(b'data'), 'two.txt')
+        self.assertEqual(self.sharepoint.digests, digests + 2)
+        self.assertEqual(self.sharepoint.files['Shared Documents/two.txt'], 4)
+
+    def test_download_missing(self):
+        documents = self.site.Documents('Shared Documents')
+        response = documents.GetFileByRelativeUrl('Shared Documents/missing.bin', 'missing.bin', self.directory)
+        self.assertEqual((response.status_code, response.text), (404, '<error />'))
+        self.assertEqual(os.listdir(self.directory), [])
+
+
+class TestExport(FakeServerTestCase):
+
+    def test_queries_on_one_list(self):
+        exporter = Exporter(JsonLinesSink(self.directory), checkpoint=os.path.join(self.directory, 'checkpoint.json'))
+        jobs = [(self.url, 'Bench', Query(Field('ID') <= 5)), (self.url, 'Bench', Query(Field('ID') > 25))]
+        results = exporter.run(jobs)
+        self.assertEqual(sorted(result['rows'] for result in results.values()), [5, self.rows - 25])
+
+    def test_duplicate_names(self):
+        exporter = Exporter(JsonLinesSink(self.directory))
+        jobs = [ExportJob(self.url, 'Bench', name='bench'),
+                ExportJob(self.url, 'Bench', Query(Field('ID') > 1), name='bench')]
+        self.assertRaises(ValueError, exporter.run, jobs)
+
+
+class TestSoap(unittest.TestCase):
+
+    def test_changed_after_to_bytes(self):
+        request = soap('GetListItems')
+        request.add_parameter('listName', 'Bench')
+        request.to_bytes()
+        request.add_query_options({'IncludeMandatoryColumns': 'FALSE'})
+        self.assertIn(b'IncludeMandatoryColumns', request.to_bytes())
+
+
+class TestReconcile(unittest.TestCase):
+
+    def test_hash_collision(self):
+        # hash(-1) == hash(-2)
+        result = reconcile([{'ID': 1, 'Amount': -2.0}], [{'ID': 1, 'Amount': -1.0}], 'ID', ['Amount'], 'ID')
+        self.assertEqual(result['changes'], [{'ID': 1, 'Amount': -2.0}])
+
+    def test_unchanged(self):
+        result = reconcile([{'ID': 1, 'Users': ['a']}], [{'ID': 1, 'Users': ['a']}], 'ID', ['Users'], 'ID')
+        self.assertEqual(result, {'changes': [], 'unique': [], 'deleted': []})
+
+    def test_missing_id(self):
+        self.assertRaises(KeyError, reconcile, [{'Key': 1, 'Amount': 2}], [{'Key': 1, 'Amount': 1}],
+                          'Key', ['Amount'], 'ID')
+        self.assertRaises(KeyError, reconcile, [], [{'Key': 1, 'Amount': 1}], 'Key', ['Amount'], 'ID')
+
+
+class _Office365(Office365):
+    """Office365 that signs in without a server"""
+
+    def _login(self, jar=None):
+        if self.Password != 'secret':
+            raise Exception('Check username/password and rootsite')
+        self.expires = time.time() + 3600
+        jar = requests.cookies.RequestsCookieJar()
+        jar.set('FedAuth', 'cookie of %s' % self.Username)
+        if self.cache_file is not None:
+            self._save_cookies(jar)
+        return jar
+
+
+class TestOffice365(unittest.TestCase):
+    site = 'https://abc.sharepoint.com'
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.directory, 'cookies.json')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+        _Office365._cookies.clear()
+
+    def test_wrong_password(self):
+        jar = _Office365(self.site, 'user', 'secret').GetCookies()
+        self.assertIs(_Office365(self.site, 'user', 'secret').GetCookies(), jar)
+        self.assertRaises(Exception, _Office365(self.site, 'user', 'wrong').GetCookies)
+
+    def test_wrong_password_cache_file(self):
+        _Office365(self.site, 'user', 'secret', cache_file=self.cache_file).GetCookies()
+        _Office365._cookies.clear()
+        jar = _Office365(self.site, 'user', 'secret', cache_file=self.cache_file).GetCookies()
+        self.assertEqual(jar.get('FedAuth'), 'cookie of user')
+        _Office365._cookies.clear()
+        office365 = _Office365(self.site, 'user', 'wrong', cache_file=self.cache_file)
+        self.assertIsNone(office365._load_cookies())
+        self.assertRaises(Exception, office365.GetCookies)
+
+
+@unittest.skipIf(aiohttp is None, 'needs aiohttp')
+class TestAsync(FakeServerTestCase):
+
+    def run_site(self, coroutine):
+        async def main():
+            async with AsyncSite(self.url) as site:
+                return await coroutine(site)
+        return asyncio.new_event_loop().run_until_complete(main())
+
+    def test_site_made_outside_loop(self):
+        site = AsyncSite(self.url, max_concurrency=2)
+
+        async def get():
+            sp_list = await site.List('Bench')
+            pages = await asyncio.gather(*[sp_list.GetListItems(fields=['ID'], rowlimit=5) for i in range(6)])
+            await site.close()
+            return pages
+        for loop in range(2):
+            self.assertEqual([len(rows) for rows in asyncio.new_event_loop().run_until_complete(get())], [5] * 6)
+
+    def test_view_without_fields(self):
+        async def get(site):
+            sp_list = await site.List('Bench')
+            return await sp_list.GetListItems('All Items', rowlimit=20)
+        self.assertEqual(len(self.run_site(get)), 20)
+
+    def test_as_columns(self):
+        async def get(site):
+            sp_list = await site.List('Bench')
+            return await asyncio.gather(sp_list.GetListItems(fields=['ID', 'Col1 Number'], as_columns=True),
+                                        sp_list.GetListItems(fields=['ID', 'Col1 Number'], as_columns=True, parallel=3))
+        for columns in self.run_site(get):
+            self.assertEqual(len(columns), self.rows)
+            self.assertEqual(columns['Col1 Number'][:2], [1.25, 2.25])
+
+    def test_changes(self):
+        async def get(site):
+            sp_list = await site.List('Bench')
+            changes = await sp_list.GetChanges(fields=['ID', 'Title'], page_size=25)
+            return changes, await sp_list.GetChanges(changes['token'], fields=['ID', 'Title'])
+        first, second = self.run_site(get)
+        self.assertEqual(len(first['added']), self.rows)
+        self.assertEqual(first['added'][0], {'ID': '1', 'Title': 'Item 1'})
+        self.assertEqual(second['deleted'], ['1'])
+        self.assertEqual(len(second['updated']), 49)
+
+    def test_bulk_insert(self):
+        rows = [{'Title': 'New %d' % i, 'Col4 User': 'Grace Hopper'} for i in range(25)]
+
+        async def insert(site):
+            sp_list = await site.List('Bench')
+            return await sp_list.BulkInsert(iter(rows), chunk_size=10)
+        results = self.run_site(insert)
+        self.assertEqual(sorted(results, key=lambda key: int(key.split(',')[0])),
+                         ['%d,New' % i for i in range(1, 26)])
+
+    def test_throttled(self):
+        self.addCleanup(setattr, self.sharepoint, 'throttle', 0)
+        self.sharepoint.throttle = 2
+
+        async def get(site):
+            sp_list = await site.List('Bench')
+            return await sp_list.GetListItems(fields=['ID'], rowlimit=5), site.throttle_stats
+        rows, stats = self.run_site(get)
+        self.assertEqual(len(rows), 5)
+        self.assertEqual((stats['throttled'], stats['retries']), (2, 2))
+
+    def test_request_digest(self):
+        digests = self.sharepoint.digests
+        self.keep_files()
+
+        async def upload(site):
+            documents, other = await asyncio.gather(site.Documents('Shared Documents'),
+                                                    site.Documents('Shared Documents'))
+            await other.UploadFile(io.BytesIO(b'data'), 'one.txt')
+            self.sharepoint.expire_digest()
+            await asyncio.gather(documents.UploadFile(io.BytesIO(b'data'), 'two.txt'),
+                                 other.UploadFile(io.BytesIO(b'data'), 'three.txt'))
+        self.run_site(upload)
+        self.assertEqual(self.sharepoint.digests, digests + 2)
+        self.assertEqual(self.sharepoint.files['Shared Documents/three.txt'], 4)
+
+    def test_sync(self):
+        async def sync(site):
+            documents = await site.Documents('Shared Documents')
+            return await documents.Sync(self.directory), await documents.Sync(self.directory)
+        first, second = self.run_site(sync)
+        self.assertEqual(len(first['downloaded']), 4)
+        self.assertEqual((second['downloaded'], len(second['unchanged'])), ([], 4))
+
+
+if __name__ == '__main__':
+    unittest.main()